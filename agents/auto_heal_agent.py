@@ -1,77 +1,269 @@
 import random
 import os
-import csv
+import asyncio
 import datetime
 import shutil
-from utils import trigger_dashboard_deployment
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils import trigger_dashboard_deployment, DASHBOARD_PORT
+from storage.rollback_journal import rollback_to_last_point
+from storage.log_sink import get_log_sink
+from deployment.latency_model import DEFAULT_TIMEOUT_S
 
 class AutoHealAgent:
     """A simple agent that can execute healing strategies."""
-    def __init__(self, healing_log_file):
+    HEAL_TYPES = {
+        'retry_deployment': "heal_retry",
+        'restore_previous_version': "heal_restore",
+        'adjust_thresholds': "heal_adjust",
+        'restore_last_good_version': "heal_restore_snapshot"
+    }
+    # Strategies worth racing in hedged mode; adjust_thresholds is an instant no-op and would always win.
+    HEDGED_STRATEGIES = ['retry_deployment', 'restore_previous_version', 'restore_last_good_version']
+    # Strategies that modify the dataset, so each hedged attempt works on its own copy.
+    ISOLATED_STRATEGIES = ['restore_previous_version', 'restore_last_good_version']
+    HEDGE_BASE_PORT = DASHBOARD_PORT + 10
+
+    def __init__(self, healing_log_file, snapshot_store=None, backend=None, latency_model=None):
         """
         Initializes the agent with the path to its log file.
+        Args:
+            healing_log_file (str): Path to the healing log.
+            snapshot_store (SnapshotStore, optional): Enables multi-generation rollback
+                with the 'restore_last_good_version' strategy.
+            backend (DeploymentBackend, optional): Where redeploys go, e.g. a warm
+                standby manager or the simulated backend. Defaults to cold-starting a
+                new dashboard process with trigger_dashboard_deployment.
+            latency_model (LatencyModel, optional): Sets the redeploy timeout per dataset
+                from recent deployment latencies instead of the fixed default.
         """
         self.healing_log_file = healing_log_file
+        self.log_sink = get_log_sink()
+        self.snapshot_store = snapshot_store
+        self.backend = backend
+        self.latency_model = latency_model
+        self.deploy_timeout = DEFAULT_TIMEOUT_S
+        self.hedge_base_port = self.HEDGE_BASE_PORT
         self.strategies = ['retry_deployment', 'restore_previous_version', 'adjust_thresholds']
+        if snapshot_store:
+            self.strategies.append('restore_last_good_version')
         self._initialize_log_file()
         print("Initialized Auto Heal Agent.")
 
     def _initialize_log_file(self):
         """Creates the healing log file with a header if it doesn't exist."""
-        os.makedirs(os.path.dirname(self.healing_log_file), exist_ok=True)
-        if not os.path.exists(self.healing_log_file):
-            with open(self.healing_log_file, 'w', newline='') as f:
-                f.write("timestamp,strategy,status,response_time_ms\n")
+        self.log_sink.register(self.healing_log_file, ["timestamp", "strategy", "status", "response_time_ms"])
 
     def _log_healing_attempt(self, strategy, status, response_time):
         """Logs the outcome of a single healing attempt."""
         timestamp = datetime.datetime.now().isoformat()
-        with open(self.healing_log_file, 'a', newline='') as f:
-            csv.writer(f).writerow([timestamp, strategy, status, round(response_time, 2)])
+        self.log_sink.write(self.healing_log_file, [timestamp, strategy, status, round(response_time, 2)])
 
     def attempt_healing(self, state, dataset_path):
         """Chooses a random healing strategy and executes it."""
         strategy = random.choice(self.strategies)
         print(f"\n--- Auto-Heal Agent: Initiating random recovery for state '{state}' ---")
         # This now calls the new, centralized execution method
-        return self.execute_action(strategy, dataset_path)
+        return self.execute_action(strategy, dataset_path, state=state)
 
-    def execute_action(self, strategy, dataset_path):
+    def execute_action(self, strategy, dataset_path, state=None):
         """
         Executes a specific, chosen healing strategy.
         This allows the RL Trainer to command this agent.
+        If the backend simulates heals, the outcome for (state, strategy) is sampled
+        from it and no files or processes are touched.
         """
         print(f"Chosen Strategy: {strategy}")
+        self._set_deploy_timeout(dataset_path)
         status, response_time = "failure", 0
-        heal_type = "unknown_strategy"
+        heal_type = self.HEAL_TYPES.get(strategy, "unknown_strategy")
 
-        if strategy == 'retry_deployment':
-            status, response_time = self._retry_deployment()
-            heal_type = "heal_retry"
-        elif strategy == 'restore_previous_version':
-            status, response_time = self._restore_previous_version(dataset_path)
-            heal_type = "heal_restore"
-        elif strategy == 'adjust_thresholds':
-            status, response_time = self._adjust_thresholds()
-            heal_type = "heal_adjust"
+        simulated = self.backend.simulate_heal(state, strategy) if self.backend and strategy in self.HEAL_TYPES else None
+        if simulated:
+            status, response_time = simulated
+        else:
+            status, response_time = self._run_strategy(strategy, dataset_path)
         
         self._log_healing_attempt(strategy, status, response_time)
         
         # Return all four values for consistency
         return status, response_time, heal_type, strategy
 
-    def _retry_deployment(self):
+    async def execute_action_async(self, strategy, dataset_path, deploy, state=None, run_blocking=asyncio.to_thread):
+        """
+        Coroutine version of execute_action for the asyncio orchestrator.
+        The strategy's file work (rollback, snapshot restore) runs through run_blocking,
+        a thread by default, and its redeploy is awaited through deploy(timeout), an async
+        callable returning (status, response_time_ms), so waiting for the dashboard never
+        blocks the event loop.
+        """
+        print(f"Chosen Strategy: {strategy}")
+        heal_type = self.HEAL_TYPES.get(strategy, "unknown_strategy")
+
+        simulated = self.backend.simulate_heal(state, strategy) if self.backend and strategy in self.HEAL_TYPES else None
+        if simulated:
+            status, response_time = simulated
+        else:
+            # The strategy stops where it would redeploy; the deploy itself is awaited here.
+            status, response_time = await run_blocking(self._run_strategy, strategy, dataset_path, lambda: ("redeploy", 0))
+            if status == "redeploy":
+                status, response_time = await deploy(self.deploy_timeout)
+
+        await run_blocking(self._log_healing_attempt, strategy, status, response_time)
+        return status, response_time, heal_type, strategy
+
+    def _run_strategy(self, strategy, dataset_path, redeploy=None, target_path=None):
+        """
+        Runs one healing strategy and returns (status, response_time_ms).
+        File changes go to target_path (defaults to the dataset itself); snapshots are
+        still looked up by dataset_path, whose history a copy does not have.
+        """
+        target_path = target_path or dataset_path
+        if strategy == 'retry_deployment':
+            return self._retry_deployment(redeploy)
+        if strategy == 'restore_previous_version':
+            return self._restore_previous_version(target_path, redeploy)
+        if strategy == 'adjust_thresholds':
+            return self._adjust_thresholds()
+        if strategy == 'restore_last_good_version':
+            return self.restore_last_good_version(dataset_path, redeploy, target_path)
+        return "failure", 0
+
+    def execute_hedged(self, dataset_path, state=None, strategies=None):
+        """
+        Races several healing strategies and keeps the first one that succeeds.
+        Each attempt runs in its own thread; strategies that change the data work on an
+        isolated copy of the dataset (with its journal and .bak), and each redeploy
+        cold-starts the dashboard on its own port. The first success is promoted (its
+        copy replaces the dataset) and the remaining attempts are cancelled. Every
+        attempt is logged with its real latency, measured from the start of the race.
+        Returns:
+            tuple: (status, response_time_ms, heal_type, strategy) of the promoted attempt,
+            or of the last attempt to finish if none succeeded.
+        """
+        strategies = strategies or [s for s in self.strategies if s in self.HEDGED_STRATEGIES]
+        print(f"Hedging strategies: {', '.join(strategies)}")
+        self._set_deploy_timeout(dataset_path)
+
+        attempts = self.backend.simulate_hedged_heal(state, strategies) if self.backend else None
+        if attempts is None:
+            attempts = self._race(strategies, dataset_path, self.deploy_timeout)
+        for strategy, status, response_time in attempts:
+            self._log_healing_attempt(strategy, status, response_time)
+
+        winner = next((attempt for attempt in attempts if attempt[1] == "success"), None)
+        if winner:
+            print(f"  -> '{winner[0]}' healed the service first ({winner[2]:.0f} ms); other attempts cancelled.")
+        strategy, status, response_time = winner or attempts[-1]
+        return status, response_time, self.HEAL_TYPES.get(strategy, "unknown_strategy"), strategy
+
+    def _race(self, strategies, dataset_path, timeout):
+        """
+        Runs the hedged attempts concurrently.
+        Returns:
+            list: (strategy, status, response_time_ms) in finishing order.
+        """
+        cancel = threading.Event()
+        attempts, winner = [], None
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(strategies)) as pool:
+            futures = {
+                pool.submit(self._run_isolated, strategy, dataset_path, cancel, timeout, self.hedge_base_port + i): strategy
+                for i, strategy in enumerate(strategies)
+            }
+            for future in as_completed(futures):
+                strategy = futures[future]
+                status, workspace = future.result()
+                if status == "success" and winner is None:
+                    winner = strategy
+                    cancel.set()
+                    if workspace:
+                        self._promote(workspace, dataset_path)
+                elif status == "success":
+                    status = "cancelled"  # Finished after the winner; its result is discarded.
+                if workspace:
+                    shutil.rmtree(workspace, ignore_errors=True)
+                attempts.append((strategy, status, (time.time() - start_time) * 1000))
+        return attempts
+
+    def _run_isolated(self, strategy, dataset_path, cancel, timeout, port):
+        """
+        Runs one hedged attempt.
+        Returns:
+            tuple: (status, workspace), where workspace is the directory holding the
+            attempt's copy of the dataset, or None if it did not need one.
+        """
+        def redeploy():
+            if cancel.is_set():
+                return "cancelled", 0
+            return trigger_dashboard_deployment(timeout=timeout, should_fail=False, port=port, cancel_event=cancel)
+
+        workspace, target_path = None, dataset_path
+        try:
+            if strategy in self.ISOLATED_STRATEGIES:
+                workspace = self._isolated_copy(dataset_path)
+                target_path = os.path.join(workspace, os.path.basename(dataset_path))
+            status, _ = self._run_strategy(strategy, dataset_path, redeploy, target_path)
+        except (KeyError, ValueError, OSError) as e:  # e.g. a corrupt rollback journal
+            print(f"  -> Hedged attempt '{strategy}' failed: {e}")
+            status = "failure"
+        return status, workspace
+
+    def _isolated_copy(self, dataset_path):
+        """
+        Copies a dataset and its rollback files into a private directory next to it
+        (same file system, so promoting the copy is an atomic rename).
+        """
+        workspace = tempfile.mkdtemp(prefix=".hedge-", dir=os.path.dirname(dataset_path) or ".")
+        for path in (dataset_path, f"{dataset_path}.journal", f"{dataset_path}.bak"):
+            if os.path.exists(path):
+                shutil.copyfile(path, os.path.join(workspace, os.path.basename(path)))
+        return workspace
+
+    def _promote(self, workspace, dataset_path):
+        """Moves the winning attempt's dataset and journal over the originals."""
+        for path in (dataset_path, f"{dataset_path}.journal"):
+            copy = os.path.join(workspace, os.path.basename(path))
+            if os.path.exists(copy):
+                os.replace(copy, path)
+        print(f"  -> Promoted the healed copy of '{dataset_path}'.")
+
+    def _set_deploy_timeout(self, dataset_path):
+        """Picks the redeploy timeout for the dataset being healed."""
+        if self.latency_model:
+            self.latency_model.update()
+            self.deploy_timeout = self.latency_model.deploy_timeout(dataset_path)
+
+    def _redeploy(self):
+        """Deploys the dashboard again through the configured backend."""
+        if self.backend:
+            return self.backend.deploy(timeout=self.deploy_timeout, should_fail=False)
+        return trigger_dashboard_deployment(timeout=self.deploy_timeout, should_fail=False)
+
+    def _retry_deployment(self, redeploy=None):
         """Healing Action 1: Simply try deploying again."""
-        return trigger_dashboard_deployment(should_fail=False)
+        return (redeploy or self._redeploy)()
+
+    def _restore_previous_version(self, dataset_path, redeploy=None):
+        """
+        Healing Action 2: Roll back to the last known good version of the data.
+        Prefers truncating to the journaled pre-append offset, which only touches the
+        rows that changed, and falls back to copying the full .bak file.
+        """
+        redeploy = redeploy or self._redeploy
+        point = rollback_to_last_point(dataset_path)
+        if point:
+            print(f"  -> Rolled back '{dataset_path}' to byte {point['offset']} (removed {point['rows_added']} row(s)).")
+            return redeploy()
 
-    def _restore_previous_version(self, dataset_path):
-        """Healing Action 2: Roll back by restoring the data from backup."""
         backup_path = f"{dataset_path}.bak"
         if os.path.exists(backup_path):
             try:
                 shutil.copyfile(backup_path, dataset_path)
                 print(f"  -> Successfully restored '{dataset_path}' from backup.")
-                return trigger_dashboard_deployment(should_fail=False)
+                return redeploy()
             except Exception as e:
                 print(f"  -> Error while restoring backup: {e}")
                 return "failure", 0
@@ -79,6 +271,46 @@ class AutoHealAgent:
             print("  -> No backup file found. Cannot restore.")
             return "failure", 0
 
+    def _restore_snapshot(self, dataset_path, snapshot, redeploy=None, target_path=None):
+        """Restores a snapshot of the dataset (into target_path, if given) and redeploys."""
+        try:
+            self.snapshot_store.restore_snapshot(dataset_path, snapshot["id"], target_path)
+            print(f"  -> Restored '{target_path or dataset_path}' to snapshot {snapshot['id']} ({', '.join(snapshot['labels']) or 'unlabelled'}).")
+            return (redeploy or self._redeploy)()
+        except (KeyError, ValueError, OSError) as e:
+            print(f"  -> Error while restoring snapshot: {e}")
+            return "failure", 0
+
+    def restore_version(self, dataset_path, versions_back=1):
+        """
+        Rolls the dataset back N snapshot generations.
+        versions_back=1 restores the version before the current one. The current
+        data is snapshotted first (cheap, since unchanged chunks are shared), so the
+        rollback itself can be undone.
+        """
+        if not self.snapshot_store:
+            print("  -> No snapshot store configured. Cannot restore.")
+            return "failure", 0
+        self.snapshot_store.create_snapshot(dataset_path)
+        snapshots = self.snapshot_store.list_snapshots(dataset_path)
+        if len(snapshots) <= versions_back:
+            print(f"  -> Only {len(snapshots)} snapshot(s) available. Cannot go back {versions_back} version(s).")
+            return "failure", 0
+        return self._restore_snapshot(dataset_path, snapshots[versions_back])
+
+    def restore_last_good_version(self, dataset_path, redeploy=None, target_path=None):
+        """
+        Healing Action 4: Restore the newest snapshot that was marked as good.
+        target_path receives the restored data instead of the dataset (hedged attempts
+        pass their isolated copy).
+        """
+        snapshots = self.snapshot_store.list_snapshots(dataset_path) if self.snapshot_store else []
+        good = next((snapshot for snapshot in snapshots if "good" in snapshot["labels"]), None)
+        if good is None:
+            print("  -> No known good snapshot found. Cannot restore.")
+            return "failure", 0
+        return self._restore_snapshot(dataset_path, good, redeploy, target_path)
+
     def _adjust_thresholds(self):
         """Healing Action 3: Simulate adjusting a performance threshold."""
         return "success", 200
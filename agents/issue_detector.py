@@ -1,12 +1,33 @@
 import pandas as pd
 import os
-import csv
+import json
+import threading
 import datetime
+from storage.csv_access import read_header, read_last_records, iter_rows_from, fingerprint, is_valid_offset
+from storage.log_sink import get_log_sink
+
+# Detector types and the IssueDetector method that checks a dataset of that type.
+DETECTOR_TYPES = {
+    "student_scores": "_check_scores",
+    "patient_health": "_check_health",
+}
+# The failure state each detector type reports for a data anomaly.
+ANOMALY_STATES = {
+    "student_scores": "anomaly_score",
+    "patient_health": "anomaly_health",
+}
+
+
+def detector_type_for(data_file):
+    """Infers the detector type from a dataset's file name, or returns None if no type matches."""
+    name = os.path.basename(data_file)
+    return next((detector_type for detector_type in DETECTOR_TYPES if detector_type in name), None)
+
 
 class IssueDetector:
     """Detects failures based on configurable thresholds from config.py."""
 
-    def __init__(self, log_file, data_file, issue_log_file, config):
+    def __init__(self, log_file, data_file, issue_log_file, config, state_file=None, latency_model=None, detector_type=None):
         """
         Initializes with config thresholds (not hardcoded).
         Args:
@@ -14,10 +35,23 @@ class IssueDetector:
             data_file (str): Path to dataset being monitored.
             issue_log_file (str): Path to log detected issues.
             config (dict): Config dictionary containing thresholds.
+            state_file (str, optional): If set, enables incremental detection. The byte
+                offset and running aggregates of the dataset are persisted here, so each
+                check only parses rows appended since the previous one.
+            latency_model (LatencyModel, optional): If set, the latency threshold is derived
+                per dataset from recent healthy deployments; config["latency_ms"] is
+                the fallback until it has enough samples.
+            detector_type (str, optional): Which data check to run, a key of DETECTOR_TYPES.
+                Inferred from the file name by default.
         """
         self.log_file = log_file
         self.data_file = data_file
         self.issue_log_file = issue_log_file
+        self.state_file = state_file
+        self.latency_model = latency_model
+        self.detector_type = detector_type or detector_type_for(data_file)
+        if self.detector_type is not None and self.detector_type not in DETECTOR_TYPES:
+            raise ValueError(f"Unknown detector type '{self.detector_type}'.")
 
         # ✅ Load thresholds dynamically
         self.latency_threshold_ms = config.get("latency_ms", 24000)
@@ -35,57 +69,160 @@ class IssueDetector:
 
     def _initialize_issue_log(self):
         """Create issue log file if missing."""
-        os.makedirs(os.path.dirname(self.issue_log_file), exist_ok=True)
-        if not os.path.exists(self.issue_log_file):
-            with open(self.issue_log_file, "w", newline="") as f:
-                csv.writer(f).writerow(["timestamp", "failure_state", "reason"])
+        # The sink is looked up on each use rather than kept on the detector, so detectors
+        # stay picklable for the multi-dataset monitor's process pool.
+        get_log_sink().register(self.issue_log_file, ["timestamp", "failure_state", "reason"])
 
     def _log_issue(self, state, reason):
         """Append detected issue."""
-        with open(self.issue_log_file, "a", newline="") as f:
-            csv.writer(f).writerow([datetime.datetime.now().isoformat(), state, reason])
+        get_log_sink().write(self.issue_log_file, [datetime.datetime.now().isoformat(), state, reason])
         print(f"Issue Detector: Logged issue -> {state}: {reason}")
 
-    def detect_failure_type(self):
-        """Check data anomalies first, then deployment issues."""
+    def _load_data_state(self):
+        """Loads the saved incremental state for this dataset, or a fresh one."""
+        fresh = {"offset": 0, "fingerprint": "", "rows": 0, "score_count": 0, "score_sum": 0.0, "last_record": None}
+        try:
+            with open(self.state_file, "r") as f:
+                saved = json.load(f).get(os.path.abspath(self.data_file))
+        except (FileNotFoundError, ValueError):
+            saved = None
+        if saved and is_valid_offset(self.data_file, saved["offset"], saved["fingerprint"]):
+            return saved
+        return fresh
+
+    def _save_data_state(self, data_state):
+        """Persists the incremental state, keyed by dataset so several detectors can share one file."""
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        try:
+            with open(self.state_file, "r") as f:
+                all_states = json.load(f)
+        except (FileNotFoundError, ValueError):
+            all_states = {}
+        all_states[os.path.abspath(self.data_file)] = data_state
+        tmp_file = f"{self.state_file}.{os.getpid()}.{threading.get_ident()}.tmp"  # Unique per writer
+        with open(tmp_file, "w") as f:
+            json.dump(all_states, f)
+        os.replace(tmp_file, self.state_file)
+
+    def _refresh_data_state(self):
+        """
+        Folds rows appended since the last check into the running aggregates.
+        If the dataset was truncated or rewritten, the saved offset no longer
+        matches and the file is rescanned from the start.
+        """
+        data_state = self._load_data_state()
+        header = read_header(self.data_file)
+        score_idx = header.index("score") if "score" in header else None
+
+        for row, offset in iter_rows_from(self.data_file, data_state["offset"]):
+            data_state["rows"] += 1
+            data_state["offset"] = offset
+            data_state["last_record"] = dict(zip(header, row))
+            if score_idx is not None and score_idx < len(row):
+                score = pd.to_numeric(row[score_idx], errors="coerce")
+                if pd.notna(score):
+                    data_state["score_count"] += 1
+                    data_state["score_sum"] += float(score)
+
+        data_state["fingerprint"] = fingerprint(self.data_file, data_state["offset"])
+        self._save_data_state(data_state)
+        return data_state
+
+    def row_count(self):
+        """Returns the number of data rows in the dataset (incremental mode only, else None)."""
+        if not self.state_file or not os.path.exists(self.data_file):
+            return None
+        return self._refresh_data_state()["rows"]
+
+    def _average_score(self):
+        """Returns the mean student score, or None when there is nothing to average."""
+        if self.state_file:
+            data_state = self._refresh_data_state()
+            if data_state["score_count"] == 0:
+                return None
+            return data_state["score_sum"] / data_state["score_count"]
+        df = pd.read_csv(self.data_file)
+        if df.empty or "score" not in df.columns:
+            return None
+        return df["score"].mean()
+
+    def _last_health_record(self):
+        """Returns the latest patient record as (heart_rate, oxygen_level), or None if empty."""
+        if self.state_file:
+            last = self._refresh_data_state()["last_record"]
+            if not last:
+                return None
+            hr = pd.to_numeric(last.get("heart_rate", 0), errors="coerce")
+            o2 = pd.to_numeric(last.get("oxygen_level", 100), errors="coerce")
+            return hr, o2
+        df = pd.read_csv(self.data_file)
+        if df.empty:
+            return None
+        return df.iloc[-1].get("heart_rate", 0), df.iloc[-1].get("oxygen_level", 100)
+
+    def _check_scores(self):
+        """Flags a low average student score."""
+        avg_score = self._average_score()
+        if avg_score is not None and avg_score < self.low_score_threshold:
+            return "anomaly_score", f"Low student performance (avg={avg_score:.2f})"
+        return "no_failure", "No issues detected."
+
+    def _check_health(self):
+        """Flags the latest patient record if its heart rate or oxygen level is out of range."""
+        record = self._last_health_record()
+        if record is not None:
+            hr, o2 = record
+            if hr > self.high_hr_threshold:
+                return "anomaly_health", f"High heart rate detected ({hr})."
+            if o2 < self.low_o2_threshold:
+                return "anomaly_health", f"Low oxygen detected ({o2})."
+        return "no_failure", "No issues detected."
+
+    def check_data(self):
+        """
+        Runs the data check for this dataset's detector type without logging.
+        Returns:
+            tuple: (failure_state, reason), with "no_failure" if the data looks fine.
+        """
+        if self.detector_type is None or not os.path.exists(self.data_file):
+            return "no_failure", "No issues detected."
+        return getattr(self, DETECTOR_TYPES[self.detector_type])()
+
+    def detect_failure_type(self, deployment=None, data_check=None):
+        """
+        Check data anomalies first, then deployment issues.
+        Args:
+            deployment (dict, optional): The deployment record to check (dataset_changed,
+                status, response_time_ms). Defaults to the last row of the deployment log,
+                which is only this dataset's deployment when one pipeline writes the log.
+            data_check (tuple, optional): (failure_state, reason) sampled by a simulated
+                backend, used instead of checking the dataset.
+        """
         try:
             # === 1️⃣ Data-based anomaly detection ===
-            if os.path.exists(self.data_file):
-                if "student_scores" in self.data_file:
-                    df = pd.read_csv(self.data_file)
-                    if not df.empty and "score" in df.columns:
-                        avg_score = df["score"].mean()
-                        if avg_score < self.low_score_threshold:
-                            state, reason = "anomaly_score", f"Low student performance (avg={avg_score:.2f})"
-                            self._log_issue(state, reason)
-                            return state, reason
-
-                elif "patient_health" in self.data_file:
-                    df = pd.read_csv(self.data_file)
-                    if not df.empty:
-                        hr = df.iloc[-1].get("heart_rate", 0)
-                        o2 = df.iloc[-1].get("oxygen_level", 100)
-                        if hr > self.high_hr_threshold:
-                            state, reason = "anomaly_health", f"High heart rate detected ({hr})."
-                            self._log_issue(state, reason)
-                            return state, reason
-                        if o2 < self.low_o2_threshold:
-                            state, reason = "anomaly_health", f"Low oxygen detected ({o2})."
-                            self._log_issue(state, reason)
-                            return state, reason
+            state, reason = data_check or self.check_data()
+            if state != "no_failure":
+                self._log_issue(state, reason)
+                return state, reason
 
             # === 2️⃣ Deployment-based issue detection ===
-            if os.path.exists(self.log_file):
-                df = pd.read_csv(self.log_file)
-                if not df.empty:
-                    last = df.iloc[-1]
+            if deployment or os.path.exists(self.log_file):
+                if not deployment:
+                    get_log_sink().flush(self.log_file)  # Rows this process logged may still be buffered.
+                last_records = [deployment] if deployment else read_last_records(self.log_file, 1)
+                if last_records:
+                    last = last_records[0]
                     status = str(last.get("status", "")).lower().strip()
                     rt = pd.to_numeric(last.get("response_time_ms"), errors="coerce")
                     if status == "failure":
                         state, reason = "deployment_failure", "Last deployment attempt failed."
                         self._log_issue(state, reason)
                         return state, reason
-                    if pd.notna(rt) and rt > self.latency_threshold_ms:
+                    threshold = self.latency_threshold_ms
+                    if self.latency_model:
+                        self.latency_model.update()
+                        threshold = self.latency_model.latency_threshold_ms(last.get("dataset_changed"), default=threshold)
+                    if pd.notna(rt) and rt > threshold:
                         state, reason = "latency_issue", f"High latency detected: {rt:.2f} ms."
                         self._log_issue(state, reason)
                         return state, reason
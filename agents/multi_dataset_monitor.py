@@ -0,0 +1,128 @@
+import os
+import glob
+import time
+import hashlib
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from agents.issue_detector import IssueDetector, detector_type_for
+from storage.log_sink import get_log_sink
+from config import THRESHOLDS, MONITORED_DATASETS
+
+
+def _check(detector):
+    """Runs one detector's data check (module level so process pools can pickle it)."""
+    try:
+        return detector.check_data()
+    except Exception as e:
+        return "no_failure", f"Error in IssueDetector: {e}"
+
+
+class MultiDatasetMonitor:
+    """
+    Checks a configurable set of datasets for data anomalies concurrently.
+    Each dataset gets an incremental IssueDetector of its mapped type with its own state
+    file, so workers never share state. Checks run on a reusable thread or process pool,
+    and every issue found in a round is appended to the one issue log in a single write.
+    """
+    def __init__(self, issue_log_file, datasets=None, config=None, state_dir="logs/monitor_state", workers=None,
+                 use_processes=False, latency_model=None):
+        """
+        Initializes the monitor.
+        Args:
+            issue_log_file (str): The shared issue log.
+            datasets (dict): Paths or glob patterns mapped to a detector type (None infers it
+                from the file name). Defaults to MONITORED_DATASETS in config.py.
+            config (dict): Detector thresholds. Defaults to THRESHOLDS.
+            state_dir (str): Directory for the per-dataset incremental state files.
+            workers (int): Pool size (defaults to the executor's own default).
+            use_processes (bool): Use a process pool instead of threads, for CPU-bound
+                checks such as the first full scan of many large datasets.
+            latency_model (LatencyModel, optional): Passed to the detectors for deployment
+                checks (see IssueDetector).
+        """
+        self.issue_log_file = issue_log_file
+        self.datasets = datasets or MONITORED_DATASETS
+        self.config = config or THRESHOLDS
+        self.state_dir = state_dir
+        self.workers = workers
+        self.use_processes = use_processes
+        self.latency_model = latency_model
+        self.detectors = {}
+        self.pool = None
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.refresh_datasets()
+        print(f"Initialized Multi-Dataset Monitor ({len(self.detectors)} dataset(s)).")
+
+    def _state_file(self, data_file):
+        """Names the state file after the dataset and a hash of its full path, so equal names don't collide."""
+        digest = hashlib.sha1(os.path.abspath(data_file).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.state_dir, f"{os.path.basename(data_file)}.{digest}.json")
+
+    def refresh_datasets(self):
+        """Expands the dataset patterns, adding detectors for new files and dropping removed ones."""
+        found = {}
+        for pattern, detector_type in self.datasets.items():
+            for path in sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else []):
+                path_type = detector_type or detector_type_for(path)
+                if path_type and path not in found:
+                    found[path] = path_type
+        for path in set(self.detectors) - set(found):
+            del self.detectors[path]
+        for path, detector_type in found.items():
+            if path not in self.detectors:
+                self.detectors[path] = IssueDetector(log_file=None, data_file=path, issue_log_file=self.issue_log_file,
+                                                     config=self.config, state_file=self._state_file(path),
+                                                     latency_model=self.latency_model, detector_type=detector_type)
+        return list(self.detectors)
+
+    def _get_pool(self):
+        if self.pool is None:
+            executor = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self.pool = executor(max_workers=self.workers)
+        return self.pool
+
+    def check_all(self, paths=None):
+        """
+        Checks every dataset (or only the given paths) and logs the issues found.
+        Returns:
+            list: (dataset, failure_state, reason) for every dataset that has an issue.
+        """
+        paths = [path for path in (paths or self.detectors) if path in self.detectors]
+        results = self._get_pool().map(_check, [self.detectors[path] for path in paths])
+        issues = [(path, state, reason) for path, (state, reason) in zip(paths, results) if state != "no_failure"]
+        self._log_issues(issues)
+        return issues
+
+    def _log_issues(self, issues):
+        """Appends a round's issues to the shared issue log as one batch."""
+        if not issues:
+            return
+        timestamp = datetime.datetime.now().isoformat()
+        get_log_sink().write_rows(self.issue_log_file, [[timestamp, state, f"{os.path.basename(path)}: {reason}"]
+                                                        for path, state, reason in issues])
+        for path, state, reason in issues:
+            print(f"Multi-Dataset Monitor: Logged issue -> {state} in {path}: {reason}")
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check many datasets for data anomalies in one pass")
+    parser.add_argument("--datasets", type=str, nargs="+",
+                        help="Dataset paths or glob patterns (default: MONITORED_DATASETS in config.py)")
+    parser.add_argument("--issue-log", type=str, default=os.path.join("logs", "issue_log.csv"))
+    parser.add_argument("--workers", type=int, help="Worker pool size")
+    parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads")
+    args = parser.parse_args()
+
+    monitor = MultiDatasetMonitor(args.issue_log, datasets=dict.fromkeys(args.datasets) if args.datasets else None,
+                                  workers=args.workers, use_processes=args.processes)
+    start_time = time.time()
+    issues = monitor.check_all()
+    elapsed = time.time() - start_time
+    monitor.shutdown()
+    print(f"\nChecked {len(monitor.detectors)} dataset(s) in {elapsed:.3f}s; {len(issues)} issue(s) found.")
@@ -1,9 +1,12 @@
 import os
 import csv
 import datetime
+from storage.csv_access import read_last_rows
+from storage.log_sink import get_log_sink
+from storage.uptime_rollup import UptimeRollup
 
 class UptimeMonitor:
-    """Maintains a synthetic uptime/downtime timeline."""
+    """Maintains a synthetic uptime/downtime timeline and its uptime/SLA rollups."""
     def __init__(self, timeline_file):
         """
         Initializes the agent with the full path to the uptime timeline file.
@@ -11,10 +14,14 @@ class UptimeMonitor:
             timeline_file (str): The path to the uptime log file (e.g., 'logs/uptime_log.csv').
         """
         self.timeline_file = timeline_file
+        self.log_sink = get_log_sink()
+        self.rollup = UptimeRollup(timeline_file)
         self.last_status = self._get_initial_status()
         if self.last_status is None:
             print(f"Initialized uptime timeline: {self.timeline_file}")
             self.update_status("UP", "Initial status check")
+        else:
+            self.rollup.update()  # Catch up with transitions written by other monitors.
         print("Initialized Uptime Monitor Agent.")
 
     def _get_initial_status(self):
@@ -29,14 +36,14 @@ class UptimeMonitor:
             return None
         else:
             try:
-                with open(self.timeline_file, 'r', newline='') as f:
-                    # Read all rows and get the last one's status
-                    rows = list(csv.reader(f))
-                    # Handle empty file or header-only file
-                    if len(rows) > 1:
-                        return rows[-1][1]
-                    else:
-                        return None
+                # Only the last row is needed, so read it backwards from EOF.
+                self.log_sink.flush(self.timeline_file)
+                rows = read_last_rows(self.timeline_file, 1)
+                # Handle empty file or header-only file
+                if rows:
+                    return rows[-1][1]
+                else:
+                    return None
             except (IOError, IndexError):
                 return None
 
@@ -44,11 +51,10 @@ class UptimeMonitor:
         """Logs a status change to the timeline if the status is different."""
         if new_status != self.last_status:
             timestamp = datetime.datetime.now().isoformat()
-            with open(self.timeline_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([timestamp, new_status, event_description])
+            self.log_sink.write(self.timeline_file, [timestamp, new_status, event_description])
             print(f"Uptime Monitor: Service status changed to {new_status}. Reason: {event_description}")
             self.last_status = new_status
+            self.rollup.update()
         else:
             print(f"Uptime Monitor: Service status remains {self.last_status}.")
 
@@ -9,3 +9,95 @@ THRESHOLDS = {
     "high_heart_rate": 120,     # Patient heart rate upper limit
     "low_oxygen_level": 95      # Patient oxygen level lower limit
 }
+
+# Outcome profiles for the simulated deployment backend (deployment/backends.py).
+# Each profile has a success probability and a (mean, std) latency in milliseconds.
+SIMULATED_BACKEND = {
+    "min_latency_ms": 50,
+
+    # Initial deployments, keyed by the requested failure type ("none" = normal deploy)
+    "deploy": {
+        "none": {"success_prob": 0.95, "latency_ms": (4000, 1000)},
+        "crash": {"success_prob": 0.0, "latency_ms": (2000, 300)},
+        "latency": {"success_prob": 1.0, "latency_ms": (30000, 4000)}
+    },
+
+    # Healing actions, keyed by failure type and then by strategy
+    "heal": {
+        "deployment_failure": {
+            "retry_deployment": {"success_prob": 0.85, "latency_ms": (4000, 1000)},
+            "restore_previous_version": {"success_prob": 0.6, "latency_ms": (5000, 1200)},
+            "adjust_thresholds": {"success_prob": 0.1, "latency_ms": (200, 50)}
+        },
+        "latency_issue": {
+            "retry_deployment": {"success_prob": 0.4, "latency_ms": (20000, 5000)},
+            "restore_previous_version": {"success_prob": 0.3, "latency_ms": (20000, 5000)},
+            "adjust_thresholds": {"success_prob": 0.9, "latency_ms": (200, 50)}
+        },
+        "anomaly_score": {
+            "retry_deployment": {"success_prob": 0.05, "latency_ms": (4000, 1000)},
+            "restore_previous_version": {"success_prob": 0.95, "latency_ms": (5000, 1200)},
+            "adjust_thresholds": {"success_prob": 0.15, "latency_ms": (200, 50)}
+        },
+        "anomaly_health": {
+            "retry_deployment": {"success_prob": 0.05, "latency_ms": (4000, 1000)},
+            "restore_previous_version": {"success_prob": 0.95, "latency_ms": (5000, 1200)},
+            "adjust_thresholds": {"success_prob": 0.15, "latency_ms": (200, 50)}
+        }
+    },
+
+    # Chance that an episode's data change is anomalous, with and without --force-anomaly
+    # (the datasets are not modified; the detector is given the sampled result)
+    "data_anomaly_prob": {"forced": 1.0, "normal": 0.0},
+
+    # Used for any deployment or heal without a specific profile
+    "default": {"success_prob": 0.5, "latency_ms": (5000, 1500)}
+}
+
+# Feature buckets for contextual RL states (rl/state_space.py).
+STATE_FEATURES = {
+    "latency_buckets_ms": [5000, 15000, 30000, 60000, 120000],      # Last deployment latency
+    "row_buckets": [1000, 10000, 100000, 1000000, 10000000],        # Dataset size in rows
+    "failure_buckets": [1, 2, 4],                                   # Failed deployments in the recent window
+    "recent_window": 10                                             # Deployments considered "recent"
+}
+
+# Adaptive deploy timeout and latency threshold (deployment/latency_model.py).
+# Both are a high percentile of recent healthy deployment times for the dataset, times a margin.
+LATENCY_MODEL = {
+    "quantile": 0.99,                           # Percentile of healthy deployment latency
+    "timeout_margin": 2.0,                      # Deploy timeout = quantile x margin
+    "threshold_margin": 1.5,                    # IssueDetector latency threshold = quantile x margin
+    "min_samples": 20,                          # Below this, the fixed defaults are used
+    "min_timeout_s": 5,
+    "max_timeout_s": 60,
+    "relative_accuracy": 0.01,                  # Sketch bucket width (1% relative error)
+    "half_life": 500,                           # Deployments after which a sample counts half
+    "action_types": ["deploy", "heal_retry"]    # Log rows that measure a plain deployment
+}
+
+# Dataset snapshots (storage/snapshot_store.py), kept with --snapshots.
+SNAPSHOTS = {
+    "keep": 100     # Newest snapshots kept per dataset (the newest 'good' one is always kept)
+}
+
+# Datasets watched by the multi-dataset monitor (agents/multi_dataset_monitor.py).
+# Keys are paths or glob patterns; values are detector types (see DETECTOR_TYPES in
+# agents/issue_detector.py), or None to infer the type from each file name.
+MONITORED_DATASETS = {
+    "dataset/*.csv": None
+}
+
+# Shared buffered log sink (storage/log_sink.py) used by every agent's CSV log.
+LOG_SINK = {
+    "flush_interval_s": 1.0,    # Buffered rows reach the files at least this often
+    "flush_rows": 100,          # ...or as soon as this many rows are waiting
+    "fsync": "never",           # 'never' (OS decides), 'flush' (fsync on every flush) or 'always' (write-through)
+    # Unix socket of a running log service (storage/log_service.py). When set (or when the
+    # LOG_SERVICE_SOCKET environment variable is), agents send their rows to the service
+    # instead of writing the files, so concurrent processes can share the logs safely.
+    "service_socket": None,
+    # SQLite event store (storage/event_store.py) that mirrors every log row, e.g.
+    # "logs/events.db", for indexed queries by time and event type. None keeps CSV only.
+    "event_store": None
+}
@@ -0,0 +1,137 @@
+import os
+import time
+import signal
+from agents.multi_dataset_monitor import MultiDatasetMonitor
+from storage.file_watcher import FileWatcher
+from storage.csv_access import read_header, iter_rows_from
+from storage.log_sink import get_log_sink
+from main import build_parser, build_agents, handle_failure, DEPLOYMENT_LOG_FILE, ISSUE_LOG_FILE, LOG_DIR
+from config import THRESHOLDS
+
+MONITOR_STATE_DIR = os.path.join(LOG_DIR, "monitor_state")
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class PipelineDaemon:
+    """
+    Long-running mode of the pipeline.
+    Builds the agents once and keeps them (with the Q-table, the incremental detector
+    state and the latency model) in memory, then waits for file changes: a changed
+    dataset only runs that dataset's data check, and new rows in the deployment log
+    only check those deployments. Detected failures are healed as in main.py.
+    """
+    def __init__(self, args, dataset_dir="dataset", use_inotify=True, poll_interval=0.5, heal_cooldown=30.0):
+        """
+        Initializes the daemon.
+        Args:
+            args (Namespace): Parsed main.py flags (see build_parser).
+            dataset_dir (str): Directory whose CSV datasets are watched.
+            use_inotify (bool): Set to False to force polling.
+            poll_interval (float): Seconds between scans in polling mode.
+            heal_cooldown (float): Seconds during which a healed dataset is not healed again,
+                so the daemon's own writes (restores, redeploy logs) cannot start a loop.
+        """
+        self.args = args
+        self.agents = build_agents(args)
+        self.monitor = MultiDatasetMonitor(ISSUE_LOG_FILE, datasets={os.path.join(dataset_dir, "*.csv"): None},
+                                           config=THRESHOLDS, state_dir=MONITOR_STATE_DIR,
+                                           latency_model=self.agents["latency_model"])
+        self.deploy_log = os.path.normpath(DEPLOYMENT_LOG_FILE)
+        self.deploy_log_offset = os.path.getsize(self.deploy_log) if os.path.exists(self.deploy_log) else 0
+        self.watcher = FileWatcher(directories=[dataset_dir], files=[self.deploy_log],
+                                   poll_interval=poll_interval, use_inotify=use_inotify)
+        self.heal_cooldown = heal_cooldown
+        self.last_heal = {}
+        self.heals = 0
+        print(f"Initialized Pipeline Daemon (watching '{dataset_dir}' and '{self.deploy_log}' via {self.watcher.mode}).")
+
+    def _new_deployments(self):
+        """Returns the deployment log rows appended since the last call."""
+        get_log_sink().flush(self.deploy_log)
+        if not os.path.exists(self.deploy_log):
+            return []
+        if os.path.getsize(self.deploy_log) < self.deploy_log_offset:
+            self.deploy_log_offset = 0  # The log was truncated or rotated.
+        header = read_header(self.deploy_log)
+        records = []
+        for row, offset in iter_rows_from(self.deploy_log, self.deploy_log_offset):
+            self.deploy_log_offset = offset
+            records.append(dict(zip(header, row)))
+        return records
+
+    def _detector_for(self, dataset):
+        dataset = os.path.normpath(dataset)
+        if dataset not in self.monitor.detectors:
+            self.monitor.refresh_datasets()
+        return self.monitor.detectors.get(dataset)
+
+    def _heal(self, dataset, failure_state, reason, changed_at):
+        """Heals a failure unless the dataset was healed within the cooldown."""
+        if time.time() - self.last_heal.get(dataset, 0) < self.heal_cooldown:
+            print(f"Daemon: '{dataset}' was healed less than {self.heal_cooldown:.0f}s ago; not healing again yet.")
+            return
+        print(f"Daemon: {failure_state} in '{dataset}' detected {(time.time() - changed_at) * 1000:.1f} ms after the change.")
+        handle_failure(self.agents, self.args, dataset, failure_state, reason, self._detector_for(dataset))
+        self.last_heal[dataset] = time.time()
+        self.heals += 1
+        trainer = self.agents["trainer"]
+        if trainer and self.heals % self.args.checkpoint_every == 0:
+            trainer.save_q_table()
+
+    def handle_changes(self, changed):
+        """Runs the checks affected by a batch of changed files."""
+        changed_at = time.time()
+        if self.deploy_log in changed:
+            for record in self._new_deployments():
+                # Heal rows are the daemon's (or a pipeline's) own recovery attempts.
+                if record.get("action_type", "deploy") != "deploy":
+                    continue
+                detector = self._detector_for(record.get("dataset_changed", ""))
+                if detector is None:
+                    continue
+                failure_state, reason = detector.detect_failure_type(deployment=record)
+                if failure_state != "no_failure":
+                    self._heal(detector.data_file, failure_state, reason, changed_at)
+
+        datasets = [path for path in changed if path != self.deploy_log]
+        if datasets:
+            self.monitor.refresh_datasets()
+            for dataset, failure_state, reason in self.monitor.check_all(datasets):
+                self._heal(dataset, failure_state, reason, changed_at)
+
+    def run(self):
+        """Waits for changes until interrupted (Ctrl+C or SIGTERM), then saves and shuts down."""
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        try:
+            while True:
+                changed = self.watcher.wait(timeout=1.0)
+                if changed:
+                    self.handle_changes(changed)
+        except KeyboardInterrupt:
+            print("\nDaemon: Shutting down.")
+        finally:
+            if self.agents["trainer"]:
+                self.agents["trainer"].save_q_table()
+            self.agents["backend"].shutdown()
+            self.monitor.shutdown()
+            self.watcher.close()
+
+
+if __name__ == "__main__":
+    parser = build_parser("CI/CD Simulation: watch datasets and the deployment log and heal on change")
+    parser.add_argument("--dataset-dir", type=str, default="dataset", help="Directory of datasets to watch")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between scans when polling")
+    parser.add_argument("--heal-cooldown", type=float, default=30.0,
+                        help="Seconds before the same dataset may be healed again")
+    args = parser.parse_args()
+    if args.hedged and args.backend == "standby":
+        parser.error("hedged healing runs its own dashboards; use the 'streamlit' or 'simulated' backend")
+    if args.feedback is None:
+        args.feedback = 'none'
+
+    PipelineDaemon(args, dataset_dir=args.dataset_dir, use_inotify=not args.poll, poll_interval=args.poll_interval,
+                   heal_cooldown=args.heal_cooldown).run()
@@ -6,6 +6,13 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import datetime
 import time
+import sys
+
+# The dashboard runs as a script, so make the repository packages importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rl.checkpoint import checkpoint_path, read_checkpoint
+from storage.frame_cache import FrameCache
+from storage.uptime_rollup import UptimeRollup, compute_uptime
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -15,7 +22,11 @@ st.set_page_config(
 )
 
 # --- Data Loading (Robust Version) ---
-@st.cache_data(ttl=5)
+@st.cache_resource
+def get_frame_cache():
+    """One cache for all sessions, so unchanged files are never re-read and growing logs only parse their new rows."""
+    return FrameCache()
+
 def load_data():
     """Loads all data sources, handling file errors and parsing issues gracefully."""
     data = {}
@@ -31,17 +42,23 @@ def load_data():
         "reward_trend": "logs/rl_performance_log.csv",
         "supervisor_override": "logs/supervisor_override_log.csv"
     }
+    # The datasets are rewritten in place; the logs only grow at the end.
+    rewritten = {"scores", "health"}
+    cache = get_frame_cache()
     for key, filename in files.items():
-        if os.path.exists(filename):
+        if key == "q_table" and os.path.exists(checkpoint_path(filename)):
+            # The binary checkpoint is memory-mapped read-only, so it is neither parsed nor copied
+            # beyond building the frame, and a concurrent save never shows up half-written.
             try:
-                if key == "q_table":
-                    data[key] = pd.read_csv(filename, index_col=0)
-                else:
-                    data[key] = pd.read_csv(filename)
-            except (pd.errors.ParserError, pd.errors.EmptyDataError):
-                st.error(f"Error parsing `{filename}`. The file may be corrupted. Please delete it and re-run the simulation.")
-                data[key] = pd.DataFrame()
-        else:
+                data[key] = read_checkpoint(checkpoint_path(filename)).to_frame()
+                continue
+            except ValueError as e:
+                st.warning(f"{e} Falling back to `{filename}`.")
+        try:
+            # Timestamp columns come back already converted to datetimes.
+            data[key] = cache.load(filename, append_only=key not in rewritten, index_col=0 if key == "q_table" else None)
+        except pd.errors.ParserError:
+            st.error(f"Error parsing `{filename}`. The file may be corrupted. Please delete it and re-run the simulation.")
             data[key] = pd.DataFrame()
     return data
 
@@ -58,10 +75,6 @@ issue_log_df = data_frames["issue_log"]
 reward_trend_df = data_frames.get("reward_trend", pd.DataFrame())
 supervisor_override_df = data_frames.get("supervisor_override", pd.DataFrame())
 
-for df in [scores_df, health_df, deploy_log_df, uptime_df, healing_log_df, feedback_df, issue_log_df, reward_trend_df, supervisor_override_df]:
-    if not df.empty and 'timestamp' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-
 # --- SIDEBAR ---
 st.sidebar.header("Dashboard Filters ⚙️")
 performance_view = st.sidebar.selectbox(
@@ -180,28 +193,47 @@ with tab2:
 # =======================================================
 with tab3:
     st.header("🩺 System Health Metrics")
-    col1, col2, col3 = st.columns(3)
-    uptime_percent = 100.0
-    if not uptime_df.empty and len(uptime_df) > 1:
-        uptime_df_sorted = uptime_df.sort_values('timestamp').dropna(subset=['timestamp'])
-        if not uptime_df_sorted.empty and len(uptime_df_sorted) > 1:
-            total_duration = (uptime_df_sorted['timestamp'].iloc[-1] - uptime_df_sorted['timestamp'].iloc[0]).total_seconds()
-            downtime_duration = 0
-            for i in range(len(uptime_df_sorted) - 1):
-                if uptime_df_sorted['status'].iloc[i] == 'DOWN':
-                    downtime_duration += (uptime_df_sorted['timestamp'].iloc[i+1] - uptime_df_sorted['timestamp'].iloc[i]).total_seconds()
-            if total_duration > 0: uptime_percent = max(0, (1 - (downtime_duration / total_duration))* 100)
-    
+    uptime_range = st.selectbox("Uptime Range", ["All time", "Last 24 hours", "Last 7 days", "Custom range"])
+    # Uptime and MTTR come from the rollups UptimeMonitor keeps as it logs transitions;
+    # only a custom range is computed from the timeline itself.
+    rollup = UptimeRollup("logs/uptime_log.csv")
+    if not rollup.is_current():
+        rollup.update()
+    if uptime_range == "Custom range":
+        today = datetime.date.today()
+        picked = st.date_input("Dates", (today - datetime.timedelta(days=7), today))
+        if len(picked) == 2 and not uptime_df.empty:
+            range_end = datetime.datetime.combine(picked[1], datetime.time.min) + datetime.timedelta(days=1)
+            uptime_stats = compute_uptime(uptime_df, datetime.datetime.combine(picked[0], datetime.time.min), range_end)
+        else:
+            uptime_stats = compute_uptime(pd.DataFrame(columns=["timestamp", "status"]))
+    else:
+        hours = {"All time": None, "Last 24 hours": 24, "Last 7 days": 24 * 7}[uptime_range]
+        uptime_stats = rollup.summary(since=datetime.datetime.now() - datetime.timedelta(hours=hours) if hours else None)
+    uptime_percent = uptime_stats["uptime_percent"] if uptime_stats["uptime_percent"] is not None else 100.0
+    mttr = f"{uptime_stats['mttr_s']:.1f}s" if uptime_stats["mttr_s"] is not None else "n/a"
+
+    col1, col2, col3, col4 = st.columns(4)
     total_error_events = len(issue_log_df) if not issue_log_df.empty else 0
     total_fix_actions = len(healing_log_df) if not healing_log_df.empty else 0
     
     with col1:
         st.metric("Uptime Score", f"{uptime_percent:.2f}%")
     with col2:
-        st.metric("Total Errors Detected", total_error_events)
+        st.metric("MTTR", mttr, help=f"Mean time to recovery over {uptime_stats['outages']} outage(s)")
     with col3:
+        st.metric("Total Errors Detected", total_error_events)
+    with col4:
         st.metric("Total Fix Actions Logged", total_fix_actions)
     
+    daily_uptime = rollup.daily_frame()
+    if not daily_uptime.empty:
+        st.subheader("Daily Availability")
+        fig_daily = px.bar(daily_uptime, x='day', y='uptime_percent', template="plotly_dark",
+                           labels={'day': 'Day', 'uptime_percent': 'Uptime (%)'})
+        fig_daily.update_yaxes(range=[0, 100])
+        st.plotly_chart(fig_daily, use_container_width=True)
+
     st.subheader("Error Type Breakdown")
     if not issue_log_df.empty:
         error_counts = issue_log_df['failure_state'].value_counts().reset_index()
@@ -0,0 +1,146 @@
+import random
+from utils import trigger_dashboard_deployment
+from agents.issue_detector import ANOMALY_STATES
+from config import SIMULATED_BACKEND
+
+
+class DeploymentBackend:
+    """
+    Interface for the systems that deploy the dashboard.
+    deploy() has the same signature and return value as trigger_dashboard_deployment.
+    """
+    name = "base"
+
+    def deploy(self, timeout=15, should_fail=False, failure_type=None):
+        """Deploys the dashboard and returns (status, response_time_ms)."""
+        raise NotImplementedError
+
+    def simulate_heal(self, state, strategy):
+        """
+        Lets a backend model a whole healing action instead of running it.
+        Returns:
+            tuple or None: (status, response_time_ms), or None to run the real action.
+        """
+        return None
+
+    def simulate_hedged_heal(self, state, strategies):
+        """
+        Lets a backend model several healing actions racing each other.
+        Returns:
+            list or None: (strategy, status, response_time_ms) per strategy in finishing
+            order, or None to run the real race.
+        """
+        return None
+
+    def simulate_data_check(self, detector_type, force_anomaly=False):
+        """
+        Lets a backend model an episode's data change and its data check.
+        Returns:
+            tuple or None: (failure_state, reason) for IssueDetector.detect_failure_type,
+            or None to change and check the real dataset.
+        """
+        return None
+
+    def shutdown(self):
+        """Releases any processes held by the backend."""
+        pass
+
+
+class StreamlitBackend(DeploymentBackend):
+    """Cold-starts a real Streamlit process for every deployment."""
+    name = "streamlit"
+
+    def deploy(self, timeout=15, should_fail=False, failure_type=None):
+        return trigger_dashboard_deployment(timeout=timeout, should_fail=should_fail, failure_type=failure_type)
+
+
+class VirtualClock:
+    """A clock that only moves when told to, so simulated waits cost no real time."""
+    def __init__(self, start=0.0):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def sleep(self, seconds):
+        self.current += max(0.0, seconds)
+
+
+class SimulatedBackend(DeploymentBackend):
+    """
+    Samples deployment and healing outcomes from configurable success probabilities
+    and latency distributions, advancing a virtual clock instead of sleeping.
+    Used for fast RL training without touching Streamlit.
+    """
+    name = "simulated"
+
+    def __init__(self, profiles=None, clock=None, seed=None):
+        """
+        Initializes the backend.
+        Args:
+            profiles (dict): Outcome profiles, see SIMULATED_BACKEND in config.py.
+            clock (VirtualClock): Clock advanced by each simulated latency.
+            seed (int): Seed for reproducible runs.
+        """
+        self.profiles = profiles or SIMULATED_BACKEND
+        self.clock = clock or VirtualClock()
+        self.rng = random.Random(seed)
+
+    def _draw(self, profile):
+        """Draws (status, response_time_ms) from a profile without moving the clock."""
+        mean, std = profile["latency_ms"]
+        response_time = max(self.profiles["min_latency_ms"], self.rng.gauss(mean, std))
+        status = "success" if self.rng.random() < profile["success_prob"] else "failure"
+        return status, response_time
+
+    def _sample(self, profile):
+        """Draws (status, response_time_ms) from a profile and advances the virtual clock."""
+        status, response_time = self._draw(profile)
+        self.clock.sleep(response_time / 1000)
+        return status, response_time
+
+    def heal_profile(self, state, strategy):
+        """Finds the profile for a (failure state, strategy) pair; states may carry a suffix like '_DOWN'."""
+        for failure_type, strategies in self.profiles["heal"].items():
+            if state and state.startswith(failure_type) and strategy in strategies:
+                return strategies[strategy]
+        return self.profiles["default"]
+
+    def deploy(self, timeout=15, should_fail=False, failure_type=None):
+        profile = self.profiles["deploy"].get(failure_type if should_fail and failure_type else "none", self.profiles["default"])
+        return self._sample(profile)
+
+    def simulate_heal(self, state, strategy):
+        return self._sample(self.heal_profile(state, strategy))
+
+    def simulate_data_check(self, detector_type, force_anomaly=False):
+        """Samples whether the data change is anomalous (see 'data_anomaly_prob'); the dataset is not touched."""
+        prob = self.profiles.get("data_anomaly_prob", {}).get("forced" if force_anomaly else "normal", 0.0)
+        state = ANOMALY_STATES.get(detector_type)
+        if state and prob > 0 and self.rng.random() < prob:  # No draw at 0, so seeded runs without anomalies are unchanged.
+            return state, f"Simulated data anomaly ({detector_type})."
+        return "no_failure", "No issues detected."
+
+    def simulate_hedged_heal(self, state, strategies):
+        """
+        Draws every strategy at once. The clock only advances until the first success
+        (or the slowest failure); strategies still running at that point are cancelled.
+        """
+        draws = sorted(((strategy,) + self._draw(self.heal_profile(state, strategy)) for strategy in strategies),
+                       key=lambda draw: draw[2])
+        finish = next((latency for _, status, latency in draws if status == "success"), draws[-1][2])
+        self.clock.sleep(finish / 1000)
+        return [(strategy, status if latency <= finish else "cancelled", min(latency, finish))
+                for strategy, status, latency in draws]
+
+
+def create_backend(name, **kwargs):
+    """Builds a deployment backend by name ('streamlit', 'standby' or 'simulated')."""
+    if name == "streamlit":
+        return StreamlitBackend()
+    if name == "standby":
+        from deployment.standby import WarmStandbyManager
+        return WarmStandbyManager(**kwargs)
+    if name == "simulated":
+        return SimulatedBackend(**kwargs)
+    raise ValueError(f"Unknown deployment backend '{name}'.")
@@ -0,0 +1,167 @@
+import os
+import math
+import json
+import threading
+import pandas as pd
+from storage.csv_access import read_header, iter_rows_from, fingerprint, is_valid_offset
+from storage.log_sink import get_log_sink
+from config import LATENCY_MODEL, THRESHOLDS
+
+DEFAULT_TIMEOUT_S = 15
+
+
+class LatencySketch:
+    """
+    Streaming percentile sketch over latencies.
+    Values are counted in logarithmic buckets (bucket i covers gamma^(i-1)..gamma^i), so any
+    percentile is known to within the relative accuracy using a few hundred counters,
+    whatever the number of samples. Older samples decay exponentially with the given
+    half-life, so the percentiles follow the recent behaviour of the deployment.
+    """
+    def __init__(self, relative_accuracy=0.01, half_life=500):
+        self.relative_accuracy = relative_accuracy
+        self.half_life = half_life
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.buckets = {}
+        self.total = 0.0        # Sum of the (scaled) bucket weights
+        self.weight = 1.0       # Weight of the next sample; grows instead of decaying every bucket
+        self.count = 0          # Number of samples ever added
+
+    def add(self, value):
+        """Adds one latency (values below 1 ms count as 1 ms)."""
+        index = math.ceil(math.log(max(value, 1.0), self.gamma))
+        self.buckets[index] = self.buckets.get(index, 0.0) + self.weight
+        self.total += self.weight
+        self.count += 1
+        self.weight *= 2 ** (1 / self.half_life)
+        if self.weight > 1e100:
+            # Rescale before the weights overflow; percentiles are unchanged.
+            self.buckets = {i: w / self.weight for i, w in self.buckets.items()}
+            self.total /= self.weight
+            self.weight = 1.0
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (0..1), or None if the sketch is empty."""
+        if not self.buckets:
+            return None
+        rank = q * self.total
+        cumulative = 0.0
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            if cumulative >= rank:
+                break
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def to_dict(self):
+        return {"relative_accuracy": self.relative_accuracy, "half_life": self.half_life, "buckets": self.buckets,
+                "total": self.total, "weight": self.weight, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"], data["half_life"])
+        sketch.buckets = {int(i): w for i, w in data["buckets"].items()}
+        sketch.total, sketch.weight, sketch.count = data["total"], data["weight"], data["count"]
+        return sketch
+
+
+class LatencyModel:
+    """
+    Keeps one latency sketch per dataset, fed incrementally from deployment_log.csv,
+    and derives the deploy timeout and the IssueDetector latency threshold from it.
+    Only successful rows of the configured action types are used, since failed
+    deployments end at the timeout or a crash and say nothing about healthy latency,
+    and rows above the current threshold (the fixed THRESHOLDS value until a dataset has
+    enough samples) are left out as latency issues.
+    Because of that filter, a sketch past warm-up cannot follow an upward drift of more
+    than the threshold margin: a deployment that became permanently slower keeps being
+    reported as a latency issue. Delete the state file to relearn from the current log.
+    """
+    def __init__(self, log_file, state_file, config=None):
+        """
+        Initializes the model.
+        Args:
+            log_file (str): Path to the deployment log.
+            state_file (str): Path where the sketches and the log offset are persisted.
+            config (dict): Settings, see LATENCY_MODEL in config.py.
+        """
+        self.log_file = log_file
+        self.state_file = state_file
+        self.config = config or LATENCY_MODEL
+        self.offset, self.fingerprint, self.sketches = 0, "", {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_file, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if is_valid_offset(self.log_file, saved["offset"], saved["fingerprint"]):
+            self.offset, self.fingerprint = saved["offset"], saved["fingerprint"]
+            self.sketches = {name: LatencySketch.from_dict(data) for name, data in saved["sketches"].items()}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp_file = f"{self.state_file}.{os.getpid()}.{threading.get_ident()}.tmp"  # Unique per writer
+        with open(tmp_file, "w") as f:
+            json.dump({"offset": self.offset, "fingerprint": self.fingerprint,
+                       "sketches": {name: sketch.to_dict() for name, sketch in self.sketches.items()}}, f)
+        os.replace(tmp_file, self.state_file)
+
+    def update(self):
+        """
+        Adds deployment log rows written since the last update. If the log was rotated
+        or rewritten, the saved offset no longer matches and the model is rebuilt.
+        Returns:
+            int: Number of latencies added.
+        """
+        get_log_sink().flush(self.log_file)
+        if not os.path.exists(self.log_file):
+            return 0
+        if not is_valid_offset(self.log_file, self.offset, self.fingerprint):
+            self.offset, self.sketches = 0, {}
+        header = read_header(self.log_file)
+        if not {"dataset_changed", "status", "response_time_ms"} <= set(header):
+            return 0
+
+        added = 0
+        for row, offset in iter_rows_from(self.log_file, self.offset):
+            self.offset = offset
+            record = dict(zip(header, row))
+            if record.get("status") != "success" or record.get("action_type", "deploy") not in self.config["action_types"]:
+                continue
+            latency = pd.to_numeric(record.get("response_time_ms"), errors="coerce")
+            if pd.isna(latency):
+                continue
+            name = os.path.basename(record["dataset_changed"])
+            if latency > self.latency_threshold_ms(name):
+                continue  # Already a latency issue; learning it would make slow deployments look normal.
+            if name not in self.sketches:
+                self.sketches[name] = LatencySketch(self.config["relative_accuracy"], self.config["half_life"])
+            self.sketches[name].add(float(latency))
+            added += 1
+        self.fingerprint = fingerprint(self.log_file, self.offset)
+        self._save()
+        return added
+
+    def percentile_ms(self, dataset):
+        """Returns the configured latency percentile for a dataset, or None with too few samples."""
+        sketch = self.sketches.get(os.path.basename(dataset or ""))
+        if sketch is None or sketch.count < self.config["min_samples"]:
+            return None
+        return sketch.quantile(self.config["quantile"])
+
+    def deploy_timeout(self, dataset, default=DEFAULT_TIMEOUT_S):
+        """Returns the deploy timeout in seconds for a dataset (percentile x margin, clamped)."""
+        percentile = self.percentile_ms(dataset)
+        if percentile is None:
+            return default
+        timeout = percentile * self.config["timeout_margin"] / 1000
+        return min(max(timeout, self.config["min_timeout_s"]), self.config["max_timeout_s"])
+
+    def latency_threshold_ms(self, dataset, default=THRESHOLDS["latency_ms"]):
+        """Returns the latency above which a successful deployment counts as a latency issue."""
+        percentile = self.percentile_ms(dataset)
+        if percentile is None:
+            return default
+        return percentile * self.config["threshold_margin"]
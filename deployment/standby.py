@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import atexit
+import threading
+from utils import start_dashboard_process, wait_for_ready, trigger_dashboard_deployment, is_dashboard_serving
+from deployment.backends import DeploymentBackend
+
+
+class WarmStandbyManager(DeploymentBackend):
+    """
+    Blue/green deployment manager for the dashboard.
+    Keeps a pre-started standby Streamlit process next to the active one. A deploy
+    (or a retry/restore heal) promotes the standby by switching the active port,
+    recycles the old process in the background and warms up a new standby, so
+    recovery does not pay interpreter, import and server startup time.
+    Since the dashboard reads its data files on every run, a standby started before
+    a data change still serves the new data once promoted.
+    """
+    name = "standby"
+
+    def __init__(self, ports=(8501, 8502), timeout=15, state_file="logs/active_dashboard.json"):
+        """
+        Initializes the manager.
+        Args:
+            ports (tuple): The two ports the blue and green instances alternate between.
+            timeout (int): Seconds to wait for an instance to become ready.
+            state_file (str): Where the active port is published for the router/proxy.
+        """
+        self.ports = ports
+        self.timeout = timeout
+        self.state_file = state_file
+        self.active = None      # (process, port) currently receiving traffic
+        self.standby = None     # (process, port) warming up or ready
+        self._standby_ready = threading.Event()
+        self._standby_status = "failure"
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+        print("Initialized Warm Standby Deployment Manager.")
+
+    def _free_port(self):
+        active_port = self.active[1] if self.active else None
+        return next(port for port in self.ports if port != active_port)
+
+    def _warm_up(self, process, port):
+        """Waits for a standby instance in the background and records whether it came up."""
+        self._standby_status = wait_for_ready(process, port, timeout=self.timeout)
+        self._standby_ready.set()
+
+    def start(self):
+        """Starts a standby instance on the port not used by the active one."""
+        with self._lock:
+            if self.standby and self.standby[0].poll() is None:
+                return
+            port = self._free_port()
+            self._standby_ready.clear()
+            self._standby_status = "failure"
+            try:
+                process = start_dashboard_process(port)
+            except OSError as e:
+                print(f"  -> Could not start standby dashboard: {e}")
+                self.standby = None
+                self._standby_ready.set()
+                return
+            self.standby = (process, port)
+            threading.Thread(target=self._warm_up, args=(process, port), daemon=True).start()
+
+    def _recycle(self, instance, then_start=False):
+        """
+        Stops a retired instance without blocking the caller. With then_start, a new
+        standby is warmed up once the old process has released its port.
+        """
+        def stop():
+            process = instance[0]
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except Exception:
+                    process.kill()
+            if then_start:
+                self.start()
+        threading.Thread(target=stop, daemon=True).start()
+
+    def _standby_alive(self):
+        return bool(self.standby) and self.standby[0].poll() is None and is_dashboard_serving(self.standby[1])
+
+    def _publish_active_port(self):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({"port": self.active[1], "pid": self.active[0].pid, "switched_at": time.time()}, f)
+        os.replace(tmp_file, self.state_file)
+
+    def deploy(self, timeout=None, should_fail=False, failure_type=None):
+        """
+        Switches traffic to the standby instance. Same signature and return value as
+        trigger_dashboard_deployment, so it can be used wherever that function is.
+        Returns:
+            tuple: (status, response_time_ms)
+        """
+        timeout = timeout or self.timeout
+        if should_fail and failure_type:
+            return trigger_dashboard_deployment(timeout=timeout, should_fail=should_fail, failure_type=failure_type)
+
+        print("Triggering dashboard deployment (warm standby)...")
+        start_time = time.time()
+        if self.standby is None:
+            self.start()
+        self._standby_ready.wait(timeout)
+        status = self._standby_status if self._standby_ready.is_set() else "failure"
+
+        # In both branches the next standby is warmed up in the background, so the
+        # following deploy or heal is instant too.
+        with self._lock:
+            retired = None
+            # The warm-up result may be stale: re-check that the standby still runs and serves before promoting it.
+            if status == "success" and not self._standby_alive():
+                print("  -> Standby instance stopped serving after warm-up.")
+                status = "failure"
+            if status == "success":
+                retired, self.active, self.standby = self.active, self.standby, None
+                self._publish_active_port()
+                print(f"  -> Switched traffic to standby on port {self.active[1]}.")
+            elif self.standby:
+                print("  -> Standby instance is not healthy. Discarding it.")
+                retired, self.standby = self.standby, None
+        response_time = (time.time() - start_time) * 1000
+
+        if retired:
+            self._recycle(retired, then_start=True)
+        else:
+            self.start()
+        return status, response_time
+
+    def shutdown(self):
+        """Stops both instances."""
+        for instance in (self.active, self.standby):
+            if instance and instance[0].poll() is None:
+                instance[0].terminate()
+        self.active = self.standby = None
@@ -1,6 +1,5 @@
-import os
-import csv
 import datetime
+from storage.log_sink import get_log_sink
 
 def get_user_feedback_from_terminal(state, action, outcome):
     """
@@ -42,16 +41,12 @@ def log_user_feedback(log_file, state, action, outcome, feedback):
         outcome (str): The system's outcome ('success' or 'failure').
         feedback (str): The user's feedback ('accepted' or 'rejected').
     """
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
     header = ["timestamp", "state", "action", "system_outcome", "user_feedback"]
     
-    file_exists = os.path.exists(log_file)
+    log_sink = get_log_sink()
+    log_sink.register(log_file, header)
     
     timestamp = datetime.datetime.now().isoformat()
-    with open(log_file, 'a', newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists or f.tell() == 0:
-            writer.writerow(header)
-        writer.writerow([timestamp, state, action, outcome, feedback])
+    log_sink.write(log_file, [timestamp, state, action, outcome, feedback])
     print(f" -> User feedback permanently stored in {log_file}")
 
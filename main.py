@@ -1,99 +1,216 @@
 import argparse
 import os
 import csv
+import time
 import datetime
 from agents.deploy_agent import DeployAgent
 from agents.issue_detector import IssueDetector
 from agents.uptime_monitor import UptimeMonitor
 from agents.auto_heal_agent import AutoHealAgent
-from rl.rl_trainer import RLTrainer 
-from utils import simulate_data_change, trigger_dashboard_deployment
+from rl.rl_trainer import RLTrainer
+from rl.state_space import StateEncoder
+from storage.snapshot_store import SnapshotStore
+from deployment.backends import create_backend
+from deployment.latency_model import LatencyModel
+from utils import simulate_data_change
 from feedback.feedback_handler import get_user_feedback_from_terminal, log_user_feedback
-from config import THRESHOLDS # This line imports the thresholds
+from config import THRESHOLDS, SNAPSHOTS # This line imports the thresholds and snapshot retention
 
-# --- Main Simulation Loop ---
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="CI/CD Simulation with Modular Agents")
-    parser.add_argument("--dataset", type=str, default="dataset/student_scores.csv")
-    parser.add_argument("--fail-type", type=str, choices=['crash', 'latency'])
-    parser.add_argument("--force-anomaly", action="store_true")
-    parser.add_argument("--planner", type=str, choices=['random', 'rl'], default='random')
-    parser.add_argument("--train", action="store_true")
-    args = parser.parse_args()
+# --- File Path Definitions ---
+LOG_DIR = "logs"
+DEPLOYMENT_LOG_FILE = os.path.join(LOG_DIR, "deployment_log.csv")
+UPTIME_LOG_FILE = os.path.join(LOG_DIR, "uptime_log.csv")
+HEALING_LOG_FILE = os.path.join(LOG_DIR, "healing_log.csv")
+RL_LOG_FILE = os.path.join(LOG_DIR, "rl_log.csv")
+PERFORMANCE_LOG_FILE = os.path.join(LOG_DIR, "rl_performance_log.csv")
+ISSUE_LOG_FILE = os.path.join(LOG_DIR, "issue_log.csv")
+USER_FEEDBACK_LOG_FILE = os.path.join(LOG_DIR, "user_feedback_log.csv")
+SNAPSHOT_DIR = os.path.join("dataset", ".snapshots")
+DETECTOR_STATE_FILE = os.path.join(LOG_DIR, "issue_detector_state.json")
+LATENCY_MODEL_FILE = os.path.join(LOG_DIR, "latency_model.json")
 
-    # --- File Path Definitions ---
-    LOG_DIR = "logs"
-    DEPLOYMENT_LOG_FILE = os.path.join(LOG_DIR, "deployment_log.csv")
-    UPTIME_LOG_FILE = os.path.join(LOG_DIR, "uptime_log.csv")
-    HEALING_LOG_FILE = os.path.join(LOG_DIR, "healing_log.csv")
-    RL_LOG_FILE = os.path.join(LOG_DIR, "rl_log.csv")
-    PERFORMANCE_LOG_FILE = os.path.join(LOG_DIR, "rl_performance_log.csv")
-    ISSUE_LOG_FILE = os.path.join(LOG_DIR, "issue_log.csv")
-    USER_FEEDBACK_LOG_FILE = os.path.join(LOG_DIR, "user_feedback_log.csv")
 
-    # --- Agent Initialization ---
-    deploy_agent = DeployAgent(log_file=DEPLOYMENT_LOG_FILE)
+def build_agents(args):
+    """Creates every agent once, so they can be reused across episodes."""
+    agents = {}
+    agents["deploy_agent"] = DeployAgent(log_file=DEPLOYMENT_LOG_FILE)
+    agents["latency_model"] = LatencyModel(DEPLOYMENT_LOG_FILE, LATENCY_MODEL_FILE)
 
     # --- THIS IS THE FIX ---
     # The configuration dictionary is correctly passed to the IssueDetector.
-    issue_detector = IssueDetector(
-        log_file=DEPLOYMENT_LOG_FILE, 
-        data_file=args.dataset, 
+    agents["issue_detector"] = IssueDetector(
+        log_file=DEPLOYMENT_LOG_FILE,
+        data_file=args.dataset,
         issue_log_file=ISSUE_LOG_FILE,
-        config=THRESHOLDS
+        config=THRESHOLDS,
+        state_file=DETECTOR_STATE_FILE,
+        latency_model=agents["latency_model"]
     )
     # -------------------------
-    
-    uptime_monitor = UptimeMonitor(timeline_file=UPTIME_LOG_FILE)
-    
-    planner = AutoHealAgent(healing_log_file=HEALING_LOG_FILE) # This agent executes the actions
-    trainer = None
+
+    agents["uptime_monitor"] = UptimeMonitor(timeline_file=UPTIME_LOG_FILE)
+
+    agents["snapshot_store"] = SnapshotStore(root=SNAPSHOT_DIR, keep=SNAPSHOTS["keep"]) if args.snapshots else None
+    agents["backend"] = create_backend(args.backend, **({"seed": args.seed} if args.backend == "simulated" else {}))
+    if args.backend == "standby":
+        agents["backend"].start()
+    print(f"Using '{agents['backend'].name}' deployment backend.")
+    agents["planner"] = AutoHealAgent(healing_log_file=HEALING_LOG_FILE, snapshot_store=agents["snapshot_store"],
+                                      backend=agents["backend"], latency_model=agents["latency_model"]) # This agent executes the actions
+    agents["trainer"] = None
     if args.planner == 'rl':
-        trainer = RLTrainer(rl_log_file=RL_LOG_FILE, performance_log_file=PERFORMANCE_LOG_FILE, train_mode=args.train)
+        agents["trainer"] = RLTrainer(rl_log_file=RL_LOG_FILE, performance_log_file=PERFORMANCE_LOG_FILE, train_mode=args.train,
+                                      strategy=args.strategy)
         print("\n--- Using RL Trainer for action selection ---")
     else:
         print("\n--- Using Random Auto-Heal Agent ---")
+    agents["state_encoder"] = StateEncoder(DEPLOYMENT_LOG_FILE) if args.contextual_states else None
+    return agents
+
+
+def handle_failure(agents, args, dataset, failure_state, reason, detector):
+    """
+    Heals a detected failure of a dataset and records the outcome.
+    Shared by run_episode and the daemon.
+    Returns:
+        str: The heal status ('success' or 'failure').
+    """
+    deploy_agent = agents["deploy_agent"]
+    uptime_monitor = agents["uptime_monitor"]
+    snapshot_store = agents["snapshot_store"]
+    planner = agents["planner"]
+    trainer = agents["trainer"]
+
+    system_status = uptime_monitor.last_status
+    full_state = f"{failure_state}_{system_status}"
+    if agents["state_encoder"]:
+        full_state = agents["state_encoder"].encode(full_state, dataset, detector.row_count())
+
+    uptime_monitor.update_status("DOWN", reason)
+
+    if args.hedged:
+        heal_status, heal_time, heal_type, chosen_action = planner.execute_hedged(dataset, state=full_state)
+    elif trainer:
+        chosen_action = trainer.choose_action(full_state)
+        heal_status, heal_time, heal_type, _ = planner.execute_action(chosen_action, dataset, state=full_state)
+    else:
+        heal_status, heal_time, heal_type, chosen_action = planner.attempt_healing(full_state, dataset)
+
+    if trainer:
+        base_reward = 1 if heal_status == 'success' else -1
+        user_feedback = None
+        if args.feedback == 'terminal':
+            user_feedback = get_user_feedback_from_terminal(full_state, chosen_action, heal_status)
+            log_user_feedback(USER_FEEDBACK_LOG_FILE, full_state, chosen_action, heal_status, user_feedback)
+        trainer.learn(full_state, chosen_action, base_reward, user_feedback)
+
+    deploy_agent.log_deployment(dataset, heal_status, heal_time, action_type=heal_type)
+
+    if heal_status == 'success':
+        uptime_monitor.update_status("UP", f"Recovery successful via {heal_type}")
+        if snapshot_store:
+            snapshot_store.create_snapshot(dataset, label="good")
+    else:
+        print("\n--- Healing attempt failed. The service remains down. ---")
+    return heal_status
+
+
+def run_episode(agents, args):
+    """Runs one simulate -> deploy -> detect -> heal episode with already-built agents."""
+    deploy_agent = agents["deploy_agent"]
+    issue_detector = agents["issue_detector"]
+    uptime_monitor = agents["uptime_monitor"]
+    snapshot_store = agents["snapshot_store"]
+
+    # 1. Simulate a data change (the simulated backend samples its outcome and leaves the dataset alone)
+    data_check = agents["backend"].simulate_data_check(issue_detector.detector_type, args.force_anomaly)
+    if data_check is None:
+        simulate_data_change(args.dataset, force_anomaly=args.force_anomaly, append_only=args.append_only,
+                             snapshot_store=snapshot_store)
 
-    # 1. Simulate a data change
-    simulate_data_change(args.dataset, force_anomaly=args.force_anomaly)
-    
     # 2. Trigger initial deployment
     should_fail = args.fail_type is not None or args.force_anomaly
-    status, time_ms = trigger_dashboard_deployment(should_fail=should_fail, failure_type=args.fail_type)
+    agents["latency_model"].update()
+    timeout = agents["latency_model"].deploy_timeout(args.dataset)
+    status, time_ms = agents["backend"].deploy(timeout=timeout, should_fail=should_fail, failure_type=args.fail_type)
     deploy_agent.log_deployment(args.dataset, status, time_ms)
 
     # 3. Detect Issues and Heal if Necessary
-    failure_state, reason = issue_detector.detect_failure_type()
-    
+    failure_state, reason = issue_detector.detect_failure_type(data_check=data_check)
+
     if failure_state != "no_failure":
-        system_status = uptime_monitor.last_status
-        full_state = f"{failure_state}_{system_status}"
-        
-        uptime_monitor.update_status("DOWN", reason)
-        
-        if trainer:
-            chosen_action = trainer.choose_action(full_state)
-            heal_status, heal_time, heal_type, _ = planner.execute_action(chosen_action, args.dataset)
-        else:
-            heal_status, heal_time, heal_type, chosen_action = planner.attempt_healing(full_state, args.dataset)
-        
-        if trainer:
-            base_reward = 1 if heal_status == 'success' else -1
-            user_feedback = get_user_feedback_from_terminal(full_state, chosen_action, heal_status)
-            log_user_feedback(USER_FEEDBACK_LOG_FILE, full_state, chosen_action, heal_status, user_feedback)
-            trainer.learn(full_state, chosen_action, base_reward, user_feedback)
-        
-        deploy_agent.log_deployment(args.dataset, heal_status, heal_time, action_type=heal_type)
-
-        if heal_status == 'success':
-            uptime_monitor.update_status("UP", f"Recovery successful via {heal_type}")
-        else:
-            print("\n--- Healing attempt failed. The service remains down. ---")
+        handle_failure(agents, args, args.dataset, failure_state, reason, issue_detector)
     else:
         uptime_monitor.update_status("UP", "Successful deployment")
+        if snapshot_store:
+            snapshot_store.create_snapshot(args.dataset, label="good")
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def build_parser(description="CI/CD Simulation with Modular Agents"):
+    """Builds the command line parser shared by main.py and the asyncio orchestrator."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--dataset", type=str, default="dataset/student_scores.csv")
+    parser.add_argument("--fail-type", type=str, choices=['crash', 'latency'])
+    parser.add_argument("--force-anomaly", action="store_true")
+    parser.add_argument("--planner", type=str, choices=['random', 'rl'], default='random')
+    parser.add_argument("--train", action="store_true")
+    parser.add_argument("--strategy", type=str, choices=RLTrainer.STRATEGIES, default='epsilon',
+                        help="RL action selection: epsilon-greedy, UCB1 or Thompson sampling")
+    parser.add_argument("--contextual-states", action="store_true",
+                        help="Add latency, dataset, size and recent-failure buckets to the RL state")
+    parser.add_argument("--append-only", action="store_true", help="Append new data instead of rewriting the dataset")
+    parser.add_argument("--snapshots", action="store_true", help="Keep versioned dataset snapshots for multi-generation rollback")
+    parser.add_argument("--backend", type=str, choices=['streamlit', 'standby', 'simulated'], default='streamlit',
+                        help="Deployment backend: cold start, warm standby switch, or simulated outcomes on a virtual clock")
+    parser.add_argument("--hedged", action="store_true",
+                        help="Race several healing strategies concurrently and keep the first success")
+    parser.add_argument("--seed", type=int, help="Random seed for the simulated backend")
+    parser.add_argument("--episodes", type=positive_int, default=1, help="Number of episodes to run in this process")
+    parser.add_argument("--checkpoint-every", type=positive_int, default=100, help="Save the Q-table every N episodes")
+    parser.add_argument("--feedback", type=str, choices=['terminal', 'none'],
+                        help="Ask for terminal feedback after each heal (default: only for single-episode runs)")
+    return parser
+
+
+# --- Main Simulation Loop ---
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.hedged and args.backend == "standby":
+        parser.error("hedged healing runs its own dashboards; use the 'streamlit' or 'simulated' backend")
+    if args.feedback is None:
+        args.feedback = 'terminal' if args.episodes == 1 else 'none'
+
+    # --- Agent Initialization ---
+    agents = build_agents(args)
+    trainer = agents["trainer"]
+
+    start_time = time.time()
+    for episode in range(1, args.episodes + 1):
+        if args.episodes > 1:
+            print(f"\n=== Episode {episode}/{args.episodes} ===")
+        run_episode(agents, args)
+
+        # Keep the Q-table in memory and only checkpoint it periodically.
+        if trainer and episode < args.episodes and episode % args.checkpoint_every == 0:
+            trainer.save_q_table()
+    elapsed = time.time() - start_time
 
     if trainer:
         trainer.save_q_table()
-        
-    print("\nCI/CD simulation finished.")
 
+    agents["backend"].shutdown()
+    if args.backend == "simulated":
+        print(f"Simulated deployment time: {agents['backend'].clock.now():.1f}s (virtual clock).")
+
+    if args.episodes > 1:
+        print(f"\nRan {args.episodes} episodes in {elapsed:.2f}s ({args.episodes / max(elapsed, 1e-9):.2f} episodes/sec).")
+    print("\nCI/CD simulation finished.")
@@ -0,0 +1,244 @@
+import os
+import time
+import random
+import asyncio
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from agents.deploy_agent import DeployAgent
+from agents.issue_detector import IssueDetector
+from agents.uptime_monitor import UptimeMonitor
+from agents.auto_heal_agent import AutoHealAgent
+from rl.rl_trainer import RLTrainer
+from rl.state_space import StateEncoder
+from storage.snapshot_store import SnapshotStore
+from deployment.backends import create_backend
+from deployment.latency_model import LatencyModel
+from utils import simulate_data_change, dashboard_command, is_dashboard_serving
+from main import (build_parser, DEPLOYMENT_LOG_FILE, UPTIME_LOG_FILE, HEALING_LOG_FILE, RL_LOG_FILE,
+                  PERFORMANCE_LOG_FILE, ISSUE_LOG_FILE, SNAPSHOT_DIR, DETECTOR_STATE_FILE, LATENCY_MODEL_FILE)
+from config import THRESHOLDS, SNAPSHOTS
+
+BASE_PORT = 8601
+
+
+class Pipeline:
+    """The per-dataset agents of one pipeline driven by the orchestrator, and its own UP/DOWN status."""
+    def __init__(self, dataset, port, detector, planner, status):
+        self.dataset = dataset
+        self.name = os.path.basename(dataset)
+        self.port = port
+        self.detector = detector
+        self.planner = planner
+        self.status = status
+
+
+class AsyncOrchestrator:
+    """
+    Drives many dataset pipelines from one process with asyncio.
+    Deployments, readiness checks, detection and healing are coroutines: dashboards are
+    started as asyncio subprocesses and probed from worker threads (so the event loop
+    never waits on a probe), each pipeline on its own port, so a slow deployment only
+    suspends its own pipeline.
+    The file work (data changes, detection, log writes) runs on a single I/O thread,
+    which keeps it off the event loop and gives the shared logs and state files one
+    writer at a time. Hedged heal races are the exception: they run on their own threads
+    so a race does not stall the other pipelines, and they only write their pipeline's
+    own dataset and the logs through the thread-safe log sink.
+    The uptime timeline is shared, so it records the combined status of all pipelines:
+    the service is DOWN while any pipeline is down.
+    """
+    def __init__(self, args, datasets, base_port=BASE_PORT):
+        """
+        Initializes the shared agents and one pipeline per dataset.
+        Args:
+            args (Namespace): Parsed main.py flags (see build_parser).
+            datasets (list): Dataset paths, one pipeline each.
+            base_port (int): Port of the first pipeline's dashboard; the others follow it.
+        """
+        self.args = args
+        self.io = ThreadPoolExecutor(max_workers=1)
+        self.deploy_agent = DeployAgent(log_file=DEPLOYMENT_LOG_FILE)
+        self.latency_model = LatencyModel(DEPLOYMENT_LOG_FILE, LATENCY_MODEL_FILE)
+        self.snapshot_store = SnapshotStore(root=SNAPSHOT_DIR, keep=SNAPSHOTS["keep"]) if args.snapshots else None
+        self.backend = create_backend(args.backend, **({"seed": args.seed} if args.backend == "simulated" else {}))
+        self.trainer = None
+        if args.planner == 'rl':
+            self.trainer = RLTrainer(rl_log_file=RL_LOG_FILE, performance_log_file=PERFORMANCE_LOG_FILE,
+                                     train_mode=args.train, strategy=args.strategy)
+        self.state_encoder = StateEncoder(DEPLOYMENT_LOG_FILE) if args.contextual_states else None
+        self.uptime_monitor = UptimeMonitor(UPTIME_LOG_FILE)
+
+        self.pipelines = []
+        for i, dataset in enumerate(datasets):
+            detector = IssueDetector(log_file=DEPLOYMENT_LOG_FILE, data_file=dataset, issue_log_file=ISSUE_LOG_FILE,
+                                     config=THRESHOLDS, state_file=DETECTOR_STATE_FILE, latency_model=self.latency_model)
+            # The orchestrator sets each planner's deploy timeout itself, on the I/O thread.
+            planner = AutoHealAgent(healing_log_file=HEALING_LOG_FILE, snapshot_store=self.snapshot_store,
+                                    backend=self.backend)
+            # Hedged races get their own block of ports after the pipelines' dashboards.
+            planner.hedge_base_port = base_port + len(datasets) + i * len(AutoHealAgent.HEDGED_STRATEGIES)
+            self.pipelines.append(Pipeline(dataset, base_port + i, detector, planner, self.uptime_monitor.last_status))
+        self.episodes_done = 0
+        print(f"Initialized asyncio orchestrator with {len(self.pipelines)} pipeline(s).")
+
+    async def _io(self, func, *args, **kwargs):
+        """Runs blocking file work on the I/O thread."""
+        return await asyncio.get_running_loop().run_in_executor(self.io, lambda: func(*args, **kwargs))
+
+    async def _is_serving(self, port, probe_timeout=1.0):
+        """
+        Returns True if the dashboard is ready, with the same rule as the synchronous
+        deploys (utils.is_dashboard_serving); the probe runs on a worker thread.
+        """
+        return await asyncio.to_thread(is_dashboard_serving, port, probe_timeout)
+
+    async def _wait_for_ready(self, process, port, timeout, interval=0.25):
+        """Polls the dashboard until it serves requests, the process exits, or the timeout expires."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if process.returncode is not None:
+                return "failure"
+            if await self._is_serving(port):
+                return "success"
+            await asyncio.sleep(interval)
+        return "failure"
+
+    async def deploy(self, port, timeout, should_fail=False, failure_type=None):
+        """
+        Coroutine version of trigger_dashboard_deployment (same simulated failures and
+        return value). The simulated backend is called directly since it never waits.
+        """
+        if self.backend.name == "simulated":
+            return self.backend.deploy(timeout=timeout, should_fail=should_fail, failure_type=failure_type)
+        if should_fail and failure_type == 'crash':
+            await asyncio.sleep(1.5)
+            return "failure", 2000
+        if should_fail and failure_type == 'latency':
+            slow_time = timeout + 5
+            await asyncio.sleep(slow_time)
+            return "success", slow_time * 1000
+
+        status, process = "failure", None
+        start_time = time.time()
+        try:
+            process = await asyncio.create_subprocess_exec(*dashboard_command(port), stdout=subprocess.DEVNULL,
+                                                           stderr=subprocess.DEVNULL)
+            status = await self._wait_for_ready(process, port, timeout)
+        except OSError as e:
+            print(f"  -> Could not start the dashboard on port {port}: {e}")
+        finally:
+            if process and process.returncode is None:
+                process.terminate()
+                await process.wait()
+        return status, (time.time() - start_time) * 1000
+
+    def _deploy_timeout(self, dataset):
+        self.latency_model.update()
+        return self.latency_model.deploy_timeout(dataset)
+
+    def _update_status(self, pipeline, status, event):
+        """Records a pipeline's status and logs the combined service status (DOWN if any pipeline is down)."""
+        pipeline.status = status
+        combined = "DOWN" if any(p.status == "DOWN" for p in self.pipelines) else "UP"
+        self.uptime_monitor.update_status(combined, f"{pipeline.name}: {event}")
+
+    async def heal(self, pipeline, state):
+        """Chooses and runs a healing action for a pipeline; returns (status, ms, heal_type, strategy)."""
+        planner = pipeline.planner
+        if self.args.hedged:
+            # The race manages its own threads, so it runs beside the I/O thread.
+            return await asyncio.to_thread(planner.execute_hedged, pipeline.dataset, state)
+        if self.trainer:
+            strategy = await self._io(self.trainer.choose_action, state)
+        else:
+            strategy = random.choice(planner.strategies)
+            print(f"\n--- Auto-Heal Agent: Initiating random recovery for state '{state}' ---")
+        return await planner.execute_action_async(strategy, pipeline.dataset, state=state, run_blocking=self._io,
+                                                  deploy=lambda timeout: self.deploy(pipeline.port, timeout))
+
+    async def run_episode(self, pipeline):
+        """Runs one simulate -> deploy -> detect -> heal episode for a pipeline (see main.run_episode)."""
+        args = self.args
+        # The simulated backend samples the data change's outcome and never touches the datasets.
+        data_check = self.backend.simulate_data_check(pipeline.detector.detector_type, args.force_anomaly)
+        if data_check is None:
+            await self._io(simulate_data_change, pipeline.dataset, force_anomaly=args.force_anomaly,
+                           append_only=args.append_only, snapshot_store=self.snapshot_store)
+
+        should_fail = args.fail_type is not None or args.force_anomaly
+        timeout = await self._io(self._deploy_timeout, pipeline.dataset)
+        status, time_ms = await self.deploy(pipeline.port, timeout, should_fail=should_fail, failure_type=args.fail_type)
+        await self._io(self.deploy_agent.log_deployment, pipeline.dataset, status, time_ms)
+
+        # Other pipelines write the same deployment log, so the detector is given this deployment.
+        deployment = {"dataset_changed": pipeline.dataset, "status": status, "response_time_ms": time_ms}
+        failure_state, reason = await self._io(pipeline.detector.detect_failure_type, deployment, data_check)
+
+        if failure_state == "no_failure":
+            await self._io(self._update_status, pipeline, "UP", "Successful deployment")
+            if self.snapshot_store:
+                await self._io(self.snapshot_store.create_snapshot, pipeline.dataset, label="good")
+            return
+
+        full_state = f"{failure_state}_{pipeline.status}"
+        if self.state_encoder:
+            rows = await self._io(pipeline.detector.row_count)
+            full_state = await self._io(self.state_encoder.encode, full_state, pipeline.dataset, rows)
+        await self._io(self._update_status, pipeline, "DOWN", reason)
+
+        pipeline.planner.deploy_timeout = timeout
+        heal_status, heal_time, heal_type, chosen_action = await self.heal(pipeline, full_state)
+        if self.trainer:
+            await self._io(self.trainer.learn, full_state, chosen_action, 1 if heal_status == 'success' else -1)
+        await self._io(self.deploy_agent.log_deployment, pipeline.dataset, heal_status, heal_time, action_type=heal_type)
+
+        if heal_status == 'success':
+            await self._io(self._update_status, pipeline, "UP", f"Recovery successful via {heal_type}")
+            if self.snapshot_store:
+                await self._io(self.snapshot_store.create_snapshot, pipeline.dataset, label="good")
+        else:
+            print(f"\n--- {pipeline.name}: Healing attempt failed. The service remains down. ---")
+
+    async def run_pipeline(self, pipeline, episodes):
+        """Runs a pipeline's episodes one after another."""
+        for _ in range(episodes):
+            await self.run_episode(pipeline)
+            self.episodes_done += 1
+            # Keep the Q-table in memory and only checkpoint it periodically.
+            if self.trainer and self.episodes_done % self.args.checkpoint_every == 0:
+                await self._io(self.trainer.save_q_table)
+
+    async def run(self, episodes):
+        """Runs every pipeline concurrently for the given number of episodes each."""
+        try:
+            await asyncio.gather(*(self.run_pipeline(pipeline, episodes) for pipeline in self.pipelines))
+        finally:
+            if self.trainer:
+                await self._io(self.trainer.save_q_table)
+            self.backend.shutdown()
+            self.io.shutdown()
+
+
+if __name__ == "__main__":
+    parser = build_parser("CI/CD Simulation: many dataset pipelines in one asyncio process")
+    parser.add_argument("--datasets", type=str, nargs="+",
+                        help="Datasets to run a pipeline for (default: --dataset)")
+    parser.add_argument("--base-port", type=int, default=BASE_PORT,
+                        help="Dashboard port of the first pipeline; each further pipeline uses the next port")
+    args = parser.parse_args()
+    if args.backend == "standby":
+        parser.error("the warm standby backend manages a single dashboard; use 'streamlit' or 'simulated'")
+    if args.feedback == 'terminal':
+        parser.error("terminal feedback cannot be collected from concurrent pipelines")
+
+    orchestrator = AsyncOrchestrator(args, args.datasets or [args.dataset], base_port=args.base_port)
+    start_time = time.time()
+    asyncio.run(orchestrator.run(args.episodes))
+    elapsed = time.time() - start_time
+
+    if args.backend == "simulated":
+        print(f"Simulated deployment time: {orchestrator.backend.clock.now():.1f}s (virtual clock).")
+    total = orchestrator.episodes_done
+    print(f"\nRan {total} episodes over {len(orchestrator.pipelines)} pipeline(s) in {elapsed:.2f}s "
+          f"({total / max(elapsed, 1e-9):.2f} episodes/sec).")
+    print("\nCI/CD simulation finished.")
@@ -0,0 +1,48 @@
+import time
+import random
+import argparse
+import pandas as pd
+from rl.q_table import QTable
+
+STATES = [f"{err}_{stat}" for err in ["deployment_failure", "latency_issue", "anomaly_score", "anomaly_health"] for stat in ["UP", "DOWN"]]
+ACTIONS = ["retry_deployment", "restore_previous_version", "adjust_thresholds"]
+
+
+def run_pandas(operations, alpha=0.1):
+    """The DataFrame-based decision/update loop RLTrainer used before QTable."""
+    q_table = pd.DataFrame(0.0, index=STATES, columns=ACTIONS)
+    for state, reward in operations:
+        untrained = q_table.loc[state][q_table.loc[state] == 0].index.tolist()
+        action = untrained[0] if untrained else q_table.loc[state].idxmax()
+        old_value = q_table.loc[state, action]
+        q_table.loc[state, action] = old_value + alpha * (reward - old_value)
+    return q_table
+
+
+def run_numpy(operations, alpha=0.1):
+    """The same loop on the NumPy-backed QTable."""
+    q_table = QTable(STATES, ACTIONS)
+    for state, reward in operations:
+        untrained = q_table.untrained_actions(state)
+        action = untrained[0] if untrained else q_table.best_action(state)
+        q_table.update(state, action, reward, alpha)
+    return q_table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark: pandas vs NumPy Q-table decisions and updates")
+    parser.add_argument("--operations", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    operations = [(rng.choice(STATES), rng.choice([-1, 1, 3])) for _ in range(args.operations)]
+
+    timings = {}
+    for name, run in [("pandas", run_pandas), ("numpy", run_numpy)]:
+        start = time.perf_counter()
+        result = run(operations)
+        timings[name] = time.perf_counter() - start
+        print(f"{name:>6}: {timings[name]:.3f}s ({args.operations / timings[name]:,.0f} decisions+updates/sec)")
+
+    assert (run_pandas(operations[:500]).to_numpy() == run_numpy(operations[:500]).to_frame().to_numpy()).all()
+    print(f"Speedup: {timings['pandas'] / timings['numpy']:.1f}x")
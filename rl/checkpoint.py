@@ -0,0 +1,106 @@
+import os
+import json
+import mmap
+import struct
+import tempfile
+import numpy as np
+from rl.q_table import QTable
+
+MAGIC = b"QTBL"
+VERSION = 1
+# magic, version, flags, n_states, n_actions, labels_length
+HEADER = struct.Struct("<4sHHIIQ")
+ALIGNMENT = 8
+
+
+def _padding(length):
+    return (-length) % ALIGNMENT
+
+
+def checkpoint_path(csv_path):
+    """Returns the binary checkpoint that sits next to a Q-table CSV (logs/rl_log.csv -> logs/rl_log.qtbl)."""
+    return os.path.splitext(csv_path)[0] + ".qtbl"
+
+
+def write_checkpoint(path, q_table):
+    """
+    Writes a Q-table as a versioned binary checkpoint.
+    Layout: fixed header, JSON state/action labels (padded to 8 bytes), then the values,
+    visits, reward sums and squared reward sums as little-endian row-major arrays.
+    The file is written to a temporary name in the same directory, fsynced and renamed
+    over the target, so readers only ever see a complete old or new checkpoint.
+    """
+    n_states, n_actions = len(q_table), len(q_table.actions)
+    labels = json.dumps({"states": q_table.states, "actions": q_table.actions}).encode("utf-8")
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".qtbl")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, n_states, n_actions, len(labels)))
+            f.write(labels + b"\0" * _padding(HEADER.size + len(labels)))
+            f.write(np.ascontiguousarray(q_table.active_values(), dtype="<f8").tobytes())
+            f.write(np.ascontiguousarray(q_table.active_visits(), dtype="<i8").tobytes())
+            f.write(np.ascontiguousarray(q_table.reward_sums[:n_states], dtype="<f8").tobytes())
+            f.write(np.ascontiguousarray(q_table.reward_sq_sums[:n_states], dtype="<f8").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_checkpoint(path, copy=False):
+    """
+    Opens a checkpoint as a QTable.
+    By default the arrays are read-only views on a memory map of the file, so there is no
+    parsing and pages are loaded lazily; pass copy=True to get writable arrays for training.
+    Raises:
+        ValueError: If the file is not a checkpoint or has an unsupported version.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError(f"'{path}' is too small to be a Q-table checkpoint.")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, _, n_states, n_actions, labels_length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a Q-table checkpoint.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported Q-table checkpoint version {version} in '{path}'.")
+
+    labels = json.loads(buffer[HEADER.size:HEADER.size + labels_length].decode("utf-8"))
+    offset = HEADER.size + labels_length + _padding(HEADER.size + labels_length)
+    count = n_states * n_actions
+
+    def array(dtype):
+        nonlocal offset
+        data = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(n_states, n_actions)
+        offset += data.nbytes
+        return data.copy() if copy else data
+
+    q_table = QTable([], labels["actions"])
+    q_table.states = labels["states"]
+    q_table.state_index = {state: i for i, state in enumerate(q_table.states)}
+    q_table.values = array("<f8")
+    q_table.visits = array("<i8")
+    q_table.reward_sums = array("<f8")
+    q_table.reward_sq_sums = array("<f8")
+    return q_table
+
+
+def write_csv_export(path, q_table):
+    """Writes the rl_log.csv compatibility export with the same write-temp-then-rename pattern."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".csv")
+    os.close(fd)
+    try:
+        q_table.to_csv(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,165 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from rl.rl_trainer import RLTrainer
+from rl.q_table import QTable
+
+
+class _SumTree:
+    """Binary tree of priority sums: proportional sampling and updates in O(log n) per tuple."""
+    def __init__(self, priorities):
+        self.count = len(priorities)
+        self.size = 1 << int(np.ceil(np.log2(max(self.count, 1))))
+        self.tree = np.zeros(2 * self.size)
+        self.tree[self.size:self.size + self.count] = priorities
+        level = self.size // 2
+        while level >= 1:
+            nodes = np.arange(level, 2 * level)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            level //= 2
+
+    def sample(self, rng, k):
+        """Draws k indices in proportion to their priorities (one per equal slice of the total)."""
+        targets = (np.arange(k) + rng.random(k)) * (self.tree[1] / k)
+        nodes = np.ones(k, dtype=np.int64)
+        while nodes[0] < self.size:
+            left = 2 * nodes
+            go_right = targets >= self.tree[left]
+            targets = np.where(go_right, targets - self.tree[left], targets)
+            nodes = left + go_right
+        return np.minimum(nodes - self.size, self.count - 1)  # Rounding can overshoot into empty leaves.
+
+    def update(self, indices, priorities):
+        """Sets the priorities of some indices and the sums above them (repeated indices are fine)."""
+        nodes = indices + self.size
+        self.tree[nodes] = priorities
+        while nodes[0] > 1:
+            nodes = nodes // 2
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+
+class OfflineTrainer:
+    """
+    Rebuilds or refines the Q-table by replaying logged (state, action, reward) tuples
+    from rl_performance_log.csv, with no new deployments.
+    Experience is replayed in vectorized mini-batches: all updates in a batch that hit
+    the same (state, action) entry are folded into one step towards their mean reward,
+    with the learning rate compounded over the number of hits.
+    """
+    def __init__(self, trainer, sampling="shuffle", batch_size=256, priority_exponent=0.6, seed=None):
+        """
+        Initializes the trainer.
+        Args:
+            trainer (RLTrainer): Trainer whose Q-table is updated (and saved).
+            sampling (str): 'shuffle' replays every tuple once per pass in random order;
+                'prioritized' samples tuples in proportion to their TD error, kept in a sum
+                tree that is rebuilt each pass and updated for the sampled tuples after
+                each batch.
+            batch_size (int): Tuples per mini-batch.
+            priority_exponent (float): How strongly prioritized sampling favours large errors.
+            seed (int): Seed for reproducible sampling.
+        """
+        if sampling not in ("shuffle", "prioritized"):
+            raise ValueError(f"Unknown sampling strategy '{sampling}'.")
+        self.trainer = trainer
+        self.sampling = sampling
+        self.batch_size = batch_size
+        self.priority_exponent = priority_exponent
+        self.rng = np.random.default_rng(seed)
+
+    def load_experience(self, performance_log_file):
+        """
+        Reads the performance log into index arrays for the trainer's Q-table.
+        Rows with unknown actions or non-numeric rewards are skipped.
+        Returns:
+            tuple: (state_indices, action_indices, rewards) as NumPy arrays.
+        """
+        log = pd.read_csv(performance_log_file)
+        log["reward"] = pd.to_numeric(log["reward"], errors="coerce")
+        q_table = self.trainer.q_table
+        log = log[log["action"].isin(q_table.action_index) & log["reward"].notna() & log["state"].notna()]
+        for state in log["state"].unique():
+            q_table.add_state(state)
+        states = log["state"].map(q_table.state_index).to_numpy(dtype=np.int64)
+        actions = log["action"].map(q_table.action_index).to_numpy(dtype=np.int64)
+        return states, actions, log["reward"].to_numpy(dtype=float)
+
+    def _apply_batch(self, states, actions, rewards):
+        """Applies one mini-batch of updates to the Q-table."""
+        q_table = self.trainer.q_table
+        n_actions = len(q_table.actions)
+        cells = len(q_table) * n_actions
+        flat = states * n_actions + actions
+        hits = np.bincount(flat, minlength=cells)
+        reward_sums = np.bincount(flat, weights=rewards, minlength=cells)
+
+        touched = np.flatnonzero(hits)
+        values = q_table.active_values().reshape(-1)
+        mean_rewards = reward_sums[touched] / hits[touched]
+        effective_alpha = 1 - (1 - self.trainer.alpha) ** hits[touched]
+        values[touched] += effective_alpha * (mean_rewards - values[touched])
+        q_table.active_visits().reshape(-1)[touched] += hits[touched]
+        q_table.reward_sums[:len(q_table)].reshape(-1)[touched] += reward_sums[touched]
+        q_table.reward_sq_sums[:len(q_table)].reshape(-1)[touched] += np.bincount(flat, weights=rewards ** 2, minlength=cells)[touched]
+
+    def _priorities(self, states, actions, rewards):
+        errors = np.abs(rewards - self.trainer.q_table.active_values()[states, actions])
+        return (errors + 1e-3) ** self.priority_exponent
+
+    def _batches(self, states, actions, rewards):
+        """Yields one pass worth of mini-batch indices using the configured sampling."""
+        n = len(rewards)
+        if self.sampling == "shuffle":
+            order = self.rng.permutation(n)
+            for start in range(0, n, self.batch_size):
+                yield order[start:start + self.batch_size]
+        else:
+            tree = _SumTree(self._priorities(states, actions, rewards))
+            for _ in range(0, n, self.batch_size):
+                batch = tree.sample(self.rng, min(self.batch_size, n))
+                yield batch
+                # The batch has been applied; refresh the TD errors of the tuples it replayed.
+                tree.update(batch, self._priorities(states[batch], actions[batch], rewards[batch]))
+
+    def train(self, performance_log_file, passes=5):
+        """
+        Replays the log for a number of passes.
+        Returns:
+            int: Number of tuples replayed in total.
+        """
+        states, actions, rewards = self.load_experience(performance_log_file)
+        if len(rewards) == 0:
+            return 0
+        replayed = 0
+        for _ in range(passes):
+            for batch in self._batches(states, actions, rewards):
+                self._apply_batch(states[batch], actions[batch], rewards[batch])
+                replayed += len(batch)
+        return replayed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Q-table training from rl_performance_log.csv")
+    parser.add_argument("--performance-log", type=str, default=os.path.join("logs", "rl_performance_log.csv"))
+    parser.add_argument("--rl-log", type=str, default=os.path.join("logs", "rl_log.csv"))
+    parser.add_argument("--mode", type=str, choices=['rebuild', 'refine'], default='refine',
+                        help="Start from an empty Q-table or refine the saved one")
+    parser.add_argument("--sampling", type=str, choices=['shuffle', 'prioritized'], default='shuffle')
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    trainer = RLTrainer(rl_log_file=args.rl_log, performance_log_file=None)
+    if args.mode == 'rebuild':
+        trainer.q_table = QTable(trainer.states, trainer.actions)
+
+    offline = OfflineTrainer(trainer, sampling=args.sampling, batch_size=args.batch_size, seed=args.seed)
+    start_time = time.time()
+    replayed = offline.train(args.performance_log, passes=args.passes)
+    elapsed = time.time() - start_time
+    print(f"Replayed {replayed} experience tuples in {elapsed:.3f}s.")
+    trainer.save_q_table()
+    print(trainer.q_table.to_frame().round(3).to_string())
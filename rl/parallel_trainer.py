@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from rl.rl_trainer import RLTrainer
+from deployment.backends import SimulatedBackend
+
+
+def _run_worker(q_table, episodes, seed, train_mode):
+    """
+    Runs simulated heal episodes on a private copy of the Q-table.
+    Workers never touch the log files; they return their table, including its
+    per-(state, action) visit counts, so the parent can merge them.
+    """
+    sys.stdout = open(os.devnull, 'w') # Per-decision prints would dominate worker time.
+    random.seed(seed)
+    trainer = RLTrainer(rl_log_file=None, performance_log_file=None, train_mode=train_mode)
+    trainer.q_table = q_table.copy()
+    backend = SimulatedBackend(seed=seed)
+
+    for _ in range(episodes):
+        state = random.choice(trainer.states)
+        action = trainer.choose_action(state)
+        heal_status, _ = backend.simulate_heal(state, action)
+        trainer.learn(state, action, 1 if heal_status == 'success' else -1)
+    return trainer.q_table
+
+
+class ParallelTrainer:
+    """
+    Trains the RL policy with episode workers spread over a process pool.
+    Each round, every worker starts from the master Q-table, gathers its own shard of
+    experience, and the master merges the results by visit-count-weighted averaging.
+    Only the master writes the Q-table file, so workers cannot clobber each other.
+    """
+    def __init__(self, rl_log_file, workers=None, train_mode=True, seed=None):
+        """
+        Initializes the trainer.
+        Args:
+            rl_log_file (str): Path to load/save the master Q-table.
+            workers (int): Number of worker processes (defaults to the CPU count).
+            train_mode (bool): Passed to each worker's RLTrainer.
+            seed (int): Base seed; worker seeds are derived from it.
+        """
+        self.master = RLTrainer(rl_log_file=rl_log_file, performance_log_file=None, train_mode=train_mode)
+        self.workers = workers or os.cpu_count() or 1
+        self.train_mode = train_mode
+        self.seed = seed if seed is not None else random.randrange(2**31)
+
+    def merge(self, results):
+        """
+        Merges worker tables into the master table.
+        Each entry becomes the average of the worker values weighted by how often each
+        worker visited it this round; entries no worker visited keep their master value.
+        """
+        master = self.master.q_table
+        for q_table in results:
+            for state in q_table.states:
+                master.add_state(state)
+        rows = len(master)
+        weighted_sum = np.zeros((rows, len(master.actions)))
+        round_visits = np.zeros((rows, len(master.actions)), dtype=np.int64)
+        round_reward_sums = np.zeros((rows, len(master.actions)))
+        round_reward_sq_sums = np.zeros((rows, len(master.actions)))
+        for q_table in results:
+            index = [master.state_index[state] for state in q_table.states]
+            n = len(q_table)
+            # Workers start from the master statistics, so the difference is this round's share.
+            worker_visits = q_table.active_visits() - master.visits[index]
+            weighted_sum[index] += q_table.active_values() * worker_visits
+            round_visits[index] += worker_visits
+            round_reward_sums[index] += q_table.reward_sums[:n] - master.reward_sums[index]
+            round_reward_sq_sums[index] += q_table.reward_sq_sums[:n] - master.reward_sq_sums[index]
+        visited = round_visits > 0
+        master.values[:rows][visited] = weighted_sum[visited] / round_visits[visited]
+        master.visits[:rows] += round_visits
+        master.reward_sums[:rows] += round_reward_sums
+        master.reward_sq_sums[:rows] += round_reward_sq_sums
+
+    def train(self, rounds, episodes_per_round, checkpoint_every=1):
+        """
+        Runs `rounds` rounds of `episodes_per_round` episodes, split across the workers.
+        Returns:
+            float: Training throughput in episodes per second.
+        """
+        shard = max(1, episodes_per_round // self.workers)
+        start_time = time.time()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for round_index in range(rounds):
+                futures = [
+                    pool.submit(_run_worker, self.master.q_table, shard,
+                                self.seed + round_index * self.workers + worker, self.train_mode)
+                    for worker in range(self.workers)
+                ]
+                self.merge([future.result() for future in futures])
+                if (round_index + 1) % checkpoint_every == 0:
+                    self.master.save_q_table()
+        elapsed = time.time() - start_time
+        self.master.save_q_table()
+        return rounds * shard * self.workers / max(elapsed, 1e-9)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel RL training on the simulated deployment backend")
+    parser.add_argument("--rl-log", type=str, default=os.path.join("logs", "rl_log.csv"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--episodes-per-round", type=int, default=1000)
+    parser.add_argument("--checkpoint-every", type=int, default=5, help="Save the master Q-table every N rounds")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    trainer = ParallelTrainer(rl_log_file=args.rl_log, workers=args.workers, seed=args.seed)
+    throughput = trainer.train(args.rounds, args.episodes_per_round, checkpoint_every=args.checkpoint_every)
+    print(f"\nTrained {args.rounds} rounds on {trainer.workers} workers ({throughput:.1f} episodes/sec).")
+    print(trainer.master.q_table.to_frame().round(3).to_string())
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+
+class QTable:
+    """
+    NumPy-backed Q-table.
+    Values live in a (states x actions) float array with dictionaries mapping state and
+    action labels to row/column indices, so lookups, argmax and updates are plain array
+    indexing instead of DataFrame .loc calls. Rows are only allocated for states that are
+    updated; reading an unknown state sees zeros without growing the table, so large
+    contextual state spaces stay as small as the part actually visited. Per-entry visit counts and reward sums
+    (plain and squared, for bandit-style action selection) are kept alongside.
+    Imports from and exports to the rl_log.csv layout (states as index, actions as columns).
+    """
+    def __init__(self, states, actions):
+        self.actions = list(actions)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.states = []
+        self.state_index = {}
+        self.values = np.zeros((0, len(self.actions)))
+        self.visits = np.zeros((0, len(self.actions)), dtype=np.int64)
+        self.reward_sums = np.zeros((0, len(self.actions)))
+        self.reward_sq_sums = np.zeros((0, len(self.actions)))
+        for state in states:
+            self.add_state(state)
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, state):
+        return state in self.state_index
+
+    def add_state(self, state):
+        """Adds a zero-initialized row for a new state and returns its index."""
+        if state in self.state_index:
+            return self.state_index[state]
+        row = len(self.states)
+        if row == self.values.shape[0]:
+            # Grow by doubling so adding states stays amortized O(1).
+            capacity = max(8, 2 * row)
+            self.values = np.resize(self.values, (capacity, len(self.actions)))
+            self.values[row:] = 0.0
+            self.visits = np.resize(self.visits, (capacity, len(self.actions)))
+            self.visits[row:] = 0
+            self.reward_sums = np.resize(self.reward_sums, (capacity, len(self.actions)))
+            self.reward_sums[row:] = 0.0
+            self.reward_sq_sums = np.resize(self.reward_sq_sums, (capacity, len(self.actions)))
+            self.reward_sq_sums[row:] = 0.0
+        self.states.append(state)
+        self.state_index[state] = row
+        return row
+
+    def row(self, state):
+        """Returns the action values of a state (zeros for a state never updated)."""
+        index = self.state_index.get(state)
+        return self.values[index] if index is not None else np.zeros(len(self.actions))
+
+    def get(self, state, action):
+        return float(self.row(state)[self.action_index[action]])
+
+    def total_visits(self, state):
+        """Returns how often any action was taken in a state."""
+        index = self.state_index.get(state)
+        return int(self.visits[index].sum()) if index is not None else 0
+
+    def best_action(self, state):
+        """Returns the highest-valued action (the first one on ties, like idxmax)."""
+        return self.actions[int(np.argmax(self.row(state)))]
+
+    def untrained_actions(self, state):
+        """Returns the actions whose value is still exactly zero for a state."""
+        return [self.actions[i] for i in np.flatnonzero(self.row(state) == 0)]
+
+    def update(self, state, action, reward, alpha):
+        """
+        Moves Q(state, action) towards the reward by the learning rate.
+        Returns:
+            tuple: (old_value, new_value)
+        """
+        s, a = self.add_state(state), self.action_index[action]
+        old_value = self.values[s, a]
+        self.values[s, a] = old_value + alpha * (reward - old_value)
+        self.visits[s, a] += 1
+        self.reward_sums[s, a] += reward
+        self.reward_sq_sums[s, a] += reward * reward
+        return float(old_value), float(self.values[s, a])
+
+    def reward_stats(self, state):
+        """
+        Returns per-action (visits, mean reward, reward variance) arrays for a state.
+        Unvisited actions have mean 0 and variance NaN; single visits have variance 0.
+        """
+        s = self.state_index.get(state)
+        if s is None:
+            zeros = np.zeros(len(self.actions))
+            return zeros.astype(np.int64), zeros, np.full(len(self.actions), np.nan)
+        visits = self.visits[s]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(visits > 0, self.reward_sums[s] / visits, 0.0)
+            variances = np.where(visits > 0, self.reward_sq_sums[s] / visits - means ** 2, np.nan)
+        return visits, means, np.maximum(variances, 0.0)
+
+    def active_values(self):
+        """Returns the value array without the unused rows reserved for growth."""
+        return self.values[:len(self.states)]
+
+    def active_visits(self):
+        return self.visits[:len(self.states)]
+
+    def copy(self):
+        clone = QTable([], self.actions)
+        clone.states = list(self.states)
+        clone.state_index = dict(self.state_index)
+        clone.values = self.values.copy()
+        clone.visits = self.visits.copy()
+        clone.reward_sums = self.reward_sums.copy()
+        clone.reward_sq_sums = self.reward_sq_sums.copy()
+        return clone
+
+    def to_frame(self):
+        """Exports the table as a DataFrame in the rl_log.csv layout."""
+        return pd.DataFrame(self.active_values(), index=self.states, columns=self.actions)
+
+    def to_csv(self, path):
+        self.to_frame().to_csv(path)
+
+    @classmethod
+    def from_frame(cls, frame, states, actions):
+        """
+        Builds a table from a DataFrame, keeping the given states and actions first
+        (any extra states in the frame are kept too) and filling missing entries with 0.
+        """
+        table = cls(list(states) + [s for s in frame.index if s not in set(states)], actions)
+        if not frame.empty:
+            common = [a for a in actions if a in frame.columns]
+            aligned = frame.reindex(index=table.states, columns=common).fillna(0.0).astype(float)
+            for action in common:
+                table.values[:len(table.states), table.action_index[action]] = aligned[action].to_numpy()
+        return table
+
+    @classmethod
+    def from_csv(cls, path, states, actions):
+        """Loads a table from rl_log.csv, or returns an all-zero one if the file is missing or empty."""
+        try:
+            frame = pd.read_csv(path, index_col=0)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            frame = pd.DataFrame()
+        return cls.from_frame(frame, states, actions)
@@ -1,72 +1,130 @@
 import pandas as pd
 import random
 import os
-import csv
+import numpy as np
+from rl.q_table import QTable
+from rl.checkpoint import checkpoint_path, read_checkpoint, write_checkpoint, write_csv_export
+from rl.state_space import StateEncoder
+from storage.log_sink import get_log_sink
 
 class RLTrainer:
     """Manages the Q-learning process, including policy updates and learning from rewards."""
-    def __init__(self, rl_log_file, performance_log_file, train_mode=False):
+    STRATEGIES = ["epsilon", "ucb", "thompson"]
+
+    def __init__(self, rl_log_file, performance_log_file, train_mode=False, strategy="epsilon"):
         """
         Initializes the trainer.
         Args:
-            rl_log_file (str): Path to save/load the Q-table.
+            rl_log_file (str): Path of the Q-table CSV export. The full table (with visit counts and
+                reward statistics) is checkpointed in binary next to it. None keeps the table in memory only.
             performance_log_file (str): Path to log performance stats (state, action, reward).
-            train_mode (bool): If True, forces exploration of untrained actions.
+                None disables the performance log.
+            train_mode (bool): If True, forces exploration of untrained actions (epsilon strategy).
+            strategy (str): Action selection: 'epsilon' (epsilon-greedy on the Q-table),
+                'ucb' (UCB1) or 'thompson' (Gaussian Thompson sampling). The bandit
+                strategies use the per-state visit counts and reward statistics.
         """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown action selection strategy '{strategy}'.")
         self.q_table_file = rl_log_file
+        self.checkpoint_file = checkpoint_path(rl_log_file) if rl_log_file else None
         self.performance_log_file = performance_log_file
         self.train_mode = train_mode
+        self.strategy = strategy
         self.states = [f"{err}_{stat}" for err in ["deployment_failure", "latency_issue", "anomaly_score", "anomaly_health"] for stat in ["UP", "DOWN"]]
         self.actions = ["retry_deployment", "restore_previous_version", "adjust_thresholds"]
         self.alpha = 0.1
         self.epsilon = 0.1
+        self.ucb_c = 2.0            # Exploration weight for UCB1 (rewards span roughly -1..3)
+        self.thompson_prior_std = 2.0  # Prior spread of an action's mean reward before it is tried
+        self.rng = np.random.default_rng()
         self.q_table = self._load_q_table()
         self._initialize_performance_log()
         print("Initialized RL Trainer.")
 
     def _initialize_performance_log(self):
         """Creates the performance log file with a header if it doesn't exist."""
-        os.makedirs(os.path.dirname(self.performance_log_file), exist_ok=True)
-        if not os.path.exists(self.performance_log_file):
-            with open(self.performance_log_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["timestamp", "state", "action", "reward"])
+        if not self.performance_log_file:
+            return
+        get_log_sink().register(self.performance_log_file, ["timestamp", "state", "action", "reward"])
 
     def _log_performance(self, state, action, reward):
         """Logs a single state, action, and reward tuple to the performance log."""
+        if not self.performance_log_file:
+            return
         timestamp = pd.Timestamp.now().isoformat()
-        with open(self.performance_log_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, state, action, reward])
+        get_log_sink().write(self.performance_log_file, [timestamp, state, action, reward])
 
     def _load_q_table(self):
-        """Loads the Q-table, creating it if it doesn't exist."""
+        """
+        Loads the Q-table from the binary checkpoint, falling back to the CSV export
+        (which has no visit counts) and creating it if neither exists.
+        """
+        if not self.q_table_file:
+            return QTable(self.states, self.actions)
         os.makedirs(os.path.dirname(self.q_table_file), exist_ok=True)
-        try:
-            qt = pd.read_csv(self.q_table_file, index_col=0)
-        except (FileNotFoundError, pd.errors.EmptyDataError):
-            qt = pd.DataFrame()
-        
-        for s in self.states:
-            if s not in qt.index: qt.loc[s] = 0.0
-        for a in self.actions:
-            if a not in qt.columns: qt[a] = 0.0
-        
-        return qt.loc[self.states, self.actions].fillna(0.0).astype(float)
+        if os.path.exists(self.checkpoint_file):
+            try:
+                q_table = read_checkpoint(self.checkpoint_file, copy=True)
+                if q_table.actions == self.actions:
+                    for state in self.states:
+                        q_table.add_state(state)
+                    return q_table
+                print(f"Warning: {self.checkpoint_file} has different actions. Loading {self.q_table_file} instead.")
+            except ValueError as e:
+                print(f"Warning: {e} Loading {self.q_table_file} instead.")
+        return QTable.from_csv(self.q_table_file, self.states, self.actions)
 
     def save_q_table(self):
-        """Saves the current Q-table to the log file."""
-        print(f"\nSaving updated Q-table to {self.q_table_file}")
-        self.q_table.to_csv(self.q_table_file)
+        """Saves the current Q-table as a binary checkpoint plus the CSV export, both replaced atomically."""
+        if not self.q_table_file:
+            return
+        print(f"\nSaving updated Q-table to {self.checkpoint_file} and {self.q_table_file}")
+        write_checkpoint(self.checkpoint_file, self.q_table)
+        write_csv_export(self.q_table_file, self.q_table)
         print("Save complete.")
 
+    def _choose_ucb(self, state):
+        """UCB1: tries every action once, then picks the best mean reward plus confidence bonus."""
+        visits, means, _ = self.q_table.reward_stats(state)
+        untried = np.flatnonzero(visits == 0)
+        if len(untried):
+            return self.actions[int(self.rng.choice(untried))]
+        bonus = self.ucb_c * np.sqrt(2 * np.log(visits.sum()) / visits)
+        return self.actions[int(np.argmax(means + bonus))]
+
+    def _choose_thompson(self, state):
+        """Thompson sampling: draws each action's mean reward from a Gaussian posterior and takes the best draw."""
+        visits, means, variances = self.q_table.reward_stats(state)
+        # Untried actions sample from the prior; tried ones shrink with their visit count.
+        # A unit pseudo-variance keeps actions that always returned the same reward from collapsing to zero spread.
+        spread = np.where(visits > 0, np.sqrt((np.nan_to_num(variances) + 1.0) / np.maximum(visits, 1)), self.thompson_prior_std)
+        return self.actions[int(np.argmax(self.rng.normal(means, spread)))]
+
+    def _decision_state(self, state):
+        """
+        Backs off from a contextual state that was never visited to its plain failure
+        state, so a new context starts from what was learned for that failure type.
+        """
+        base = StateEncoder.base_state(state)
+        if base != state and self.q_table.total_visits(state) == 0:
+            return base
+        return state
+
     def choose_action(self, state):
         """Chooses an action based on the current policy."""
-        if state not in self.q_table.index:
-            self.q_table.loc[state] = 0.0
-        
+        state = self._decision_state(state)
+        if self.strategy == "ucb":
+            action = self._choose_ucb(state)
+            print(f"RL Trainer (UCB1): Chose action '{action}'")
+            return action
+        if self.strategy == "thompson":
+            action = self._choose_thompson(state)
+            print(f"RL Trainer (Thompson): Chose action '{action}'")
+            return action
+
         if self.train_mode:
-            untrained = self.q_table.loc[state][self.q_table.loc[state] == 0].index.tolist()
+            untrained = self.q_table.untrained_actions(state)
             if untrained:
                 action = random.choice(untrained)
                 print(f"RL Trainer (Training Mode): Forcing untrained action '{action}'")
@@ -76,7 +134,7 @@ class RLTrainer:
             action = random.choice(self.actions)
             print(f"RL Trainer: Exploring -> Randomly chose action '{action}'")
         else:
-            action = self.q_table.loc[state].idxmax()
+            action = self.q_table.best_action(state)
             print(f"RL Trainer: Exploiting -> Chose best action '{action}'")
         return action
 
@@ -97,8 +155,10 @@ class RLTrainer:
         final_reward = base_reward + user_reward_bonus
         self._log_performance(state, action, final_reward)
         
-        old_value = self.q_table.loc[state, action]
-        new_value = old_value + self.alpha * (final_reward - old_value)
-        self.q_table.loc[state, action] = new_value
+        old_value, new_value = self.q_table.update(state, action, final_reward, self.alpha)
         print(f"RL Trainer: Policy updated for state '{state}', action '{action}'. {old_value:.3f} -> {new_value:.3f}")
+        # Contextual states also update their plain failure state, which serves as the back-off.
+        base = StateEncoder.base_state(state)
+        if base != state:
+            self.q_table.update(base, action, final_reward, self.alpha)
 
@@ -0,0 +1,83 @@
+import os
+import pandas as pd
+from storage.csv_access import read_last_records
+from storage.log_sink import get_log_sink
+from config import STATE_FEATURES
+
+
+def _format_count(value):
+    for unit, size in (("M", 1_000_000), ("k", 1_000)):
+        if value >= size:
+            return f"{value / size:g}{unit}"
+    return f"{value:g}"
+
+
+def _format_ms(value):
+    return f"{value / 1000:g}s"
+
+
+def bucket(value, edges, formatter=_format_count):
+    """Maps a number to a label such as '<1k', '1k-10k' or '10M+' using sorted bucket edges."""
+    if value is None or pd.isna(value):
+        return "na"
+    if value < edges[0]:
+        return f"<{formatter(edges[0])}"
+    for low, high in zip(edges, edges[1:]):
+        if value < high:
+            return f"{formatter(low)}-{formatter(high)}"
+    return f"{formatter(edges[-1])}+"
+
+
+class StateEncoder:
+    """
+    Builds contextual RL states from features the agents already see: the last deployment
+    latency, the dataset name, its size and the number of recent failed deployments.
+    Each feature is bucketed, and the state key keeps the plain failure state as its prefix
+    (e.g. 'latency_issue_DOWN|lat=15s-30s|ds=student_scores|rows=<1k|fails=1-2'), so
+    code keyed on the failure state still recognises it.
+    """
+    SEPARATOR = "|"
+
+    def __init__(self, deploy_log_file, features=None):
+        """
+        Args:
+            deploy_log_file (str): Deployment log used for latency and recent failures.
+            features (dict): Bucket configuration, see STATE_FEATURES in config.py.
+        """
+        self.deploy_log_file = deploy_log_file
+        self.features = features or STATE_FEATURES
+
+    @classmethod
+    def base_state(cls, state):
+        """Strips the context from a state key, leaving e.g. 'latency_issue_DOWN'."""
+        return state.split(cls.SEPARATOR, 1)[0]
+
+    def _recent_deployments(self):
+        """Returns the latency of the last deployment and the failures in the recent window."""
+        get_log_sink().flush(self.deploy_log_file)
+        if not os.path.exists(self.deploy_log_file):
+            return None, None
+        recent = read_last_records(self.deploy_log_file, self.features["recent_window"])
+        if not recent:
+            return None, None
+        latency = pd.to_numeric(recent[-1].get("response_time_ms"), errors="coerce")
+        failures = sum(1 for record in recent if str(record.get("status", "")).strip().lower() == "failure")
+        return latency, failures
+
+    def encode(self, state, dataset_path=None, rows=None):
+        """
+        Adds bucketed context to a plain failure state.
+        Args:
+            state (str): Failure state such as 'deployment_failure_DOWN'.
+            dataset_path (str): Dataset being deployed.
+            rows (int): Number of rows in the dataset, if known.
+        """
+        latency, failures = self._recent_deployments()
+        parts = [
+            state,
+            f"lat={bucket(latency, self.features['latency_buckets_ms'], _format_ms)}",
+            f"ds={os.path.splitext(os.path.basename(dataset_path))[0] if dataset_path else 'na'}",
+            f"rows={bucket(rows, self.features['row_buckets'])}",
+            f"fails={bucket(failures, self.features['failure_buckets'])}"
+        ]
+        return self.SEPARATOR.join(parts)
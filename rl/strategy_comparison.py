@@ -0,0 +1,77 @@
+import io
+import random
+import argparse
+import contextlib
+import numpy as np
+from rl.rl_trainer import RLTrainer
+from deployment.backends import SimulatedBackend
+from config import SIMULATED_BACKEND
+
+
+def optimal_policy(states, actions, profiles=SIMULATED_BACKEND):
+    """Returns the action with the highest success probability for each state, per the simulation profiles."""
+    backend = SimulatedBackend(profiles=profiles)
+    return {state: max(actions, key=lambda action: backend.heal_profile(state, action)["success_prob"]) for state in states}
+
+
+def run_strategy(strategy, episodes, stable_window, seed):
+    """
+    Trains one strategy on the simulated backend until its greedy policy matches the
+    optimal one for every state for `stable_window` consecutive episodes.
+    Returns:
+        dict: episodes and cumulative heal time (seconds) spent until convergence,
+        or None values if it did not converge within `episodes`.
+    """
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trainer = RLTrainer(rl_log_file=None, performance_log_file=None, train_mode=True, strategy=strategy)
+    trainer.rng = np.random.default_rng(seed)
+    backend = SimulatedBackend(seed=seed)
+    target = optimal_policy(trainer.states, trainer.actions)
+
+    heal_time_ms, stable, converged_at, time_at_convergence = 0.0, 0, None, None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for episode in range(1, episodes + 1):
+            state = random.choice(trainer.states)
+            action = trainer.choose_action(state)
+            status, response_time = backend.simulate_heal(state, action)
+            heal_time_ms += response_time
+            trainer.learn(state, action, 1 if status == 'success' else -1)
+
+            # For the bandit strategies the learned policy is the best mean reward; otherwise the best Q-value.
+            if strategy == "epsilon":
+                greedy = {s: trainer.q_table.best_action(s) for s in trainer.states}
+            else:
+                greedy = {s: trainer.actions[int(np.argmax(trainer.q_table.reward_stats(s)[1]))] for s in trainer.states}
+            stable = stable + 1 if greedy == target else 0
+            if stable == 1:
+                time_at_convergence = heal_time_ms
+            if stable == stable_window:
+                converged_at = episode - stable_window + 1
+                break
+
+    return {
+        "episodes": converged_at,
+        "heal_time_s": time_at_convergence / 1000 if converged_at else None
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare epsilon-greedy, UCB1 and Thompson sampling on the simulated backend")
+    parser.add_argument("--strategies", nargs="+", default=RLTrainer.STRATEGIES, choices=RLTrainer.STRATEGIES)
+    parser.add_argument("--runs", type=int, default=20, help="Independent seeds per strategy")
+    parser.add_argument("--max-episodes", type=int, default=5000)
+    parser.add_argument("--stable-window", type=int, default=100,
+                        help="Episodes the greedy policy must stay optimal to count as converged")
+    args = parser.parse_args()
+
+    print(f"{'strategy':<10} {'converged':>10} {'median episodes':>16} {'mean episodes':>14} {'mean heal time (s)':>19}")
+    for strategy in args.strategies:
+        results = [run_strategy(strategy, args.max_episodes, args.stable_window, seed) for seed in range(args.runs)]
+        done = [r for r in results if r["episodes"] is not None]
+        if done:
+            episodes = [r["episodes"] for r in done]
+            heal_time = np.mean([r["heal_time_s"] for r in done])
+            print(f"{strategy:<10} {len(done):>5}/{args.runs:<4} {np.median(episodes):>16.0f} {np.mean(episodes):>14.1f} {heal_time:>19.1f}")
+        else:
+            print(f"{strategy:<10} {0:>5}/{args.runs:<4} {'-':>16} {'-':>14} {'-':>19}")
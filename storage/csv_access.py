@@ -0,0 +1,117 @@
+import os
+import csv
+import hashlib
+
+FINGERPRINT_BYTES = 64
+
+
+def read_header(path):
+    """Returns the header row of a CSV file, or an empty list if the file is empty."""
+    with open(path, 'r', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def iter_rows_from(path, offset=0):
+    """
+    Yields (row, end_offset) for every complete CSV line after a byte offset.
+    The header is skipped when reading from the start of the file, and a trailing
+    line without a newline is left for the next call since it may still be written.
+    Args:
+        path (str): Path to the CSV file.
+        offset (int): Byte offset to resume from (0 = start of file).
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        if offset == 0:
+            header_line = f.readline()
+            if not header_line.endswith(b'\n'):
+                return
+            offset = f.tell()
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            text = line.decode('utf-8').rstrip('\r\n')
+            if text:
+                yield next(csv.reader([text])), offset
+
+
+def fingerprint(path, offset, length=FINGERPRINT_BYTES):
+    """Hashes the bytes just before `offset` so a reader can tell if the file was rewritten."""
+    start = max(0, offset - length)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def is_valid_offset(path, offset, expected_fingerprint):
+    """Checks that a saved offset still points into the same file contents."""
+    if not os.path.exists(path) or os.path.getsize(path) < offset:
+        return False
+    return fingerprint(path, offset) == expected_fingerprint
+
+
+def read_last_rows(path, n=1, block_size=8192):
+    """
+    Returns the last `n` data rows of a CSV file by seeking backwards from EOF,
+    so the cost depends on the size of those rows rather than the whole log.
+    The header row is never returned.
+    Args:
+        path (str): Path to the CSV file.
+        n (int): Number of rows to return (oldest first).
+        block_size (int): Bytes read per backwards step.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        # n rows need n + 1 line breaks before them, unless the start of the file is reached.
+        while position > 0 and data.count(b'\n') <= n + 1:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    # At the start of the file the first line is the header; otherwise it is a partial line.
+    lines = data.decode('utf-8', errors='replace').splitlines()[1:]
+    lines = [line for line in lines if line.strip()]
+    return [next(csv.reader([line])) for line in lines[-n:]] if n > 0 else []
+
+
+def read_last_records(path, n=1):
+    """Same as read_last_rows, but returns dicts keyed by the header columns."""
+    header = read_header(path)
+    return [dict(zip(header, row)) for row in read_last_rows(path, n)]
+
+
+def append_rows(path, records):
+    """
+    Appends records to the end of a CSV file without reading or rewriting existing rows.
+    Every record must have exactly the columns of the file's header.
+    Args:
+        path (str): Path to the CSV file.
+        records (list[dict]): Rows to append, keyed by column name.
+    Returns:
+        int: The file size before the append, i.e. the offset to truncate back to.
+    Raises:
+        ValueError: If a record does not match the header schema.
+    """
+    header = read_header(path)
+    for record in records:
+        if set(record) != set(header):
+            raise ValueError(f"Record columns {sorted(record)} do not match header {header} of '{path}'.")
+
+    offset = os.path.getsize(path)
+    needs_newline = False
+    if offset > 0:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+    with open(path, 'a', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        writer = csv.writer(f)
+        for record in records:
+            writer.writerow([record[column] for column in header])
+    return offset
@@ -0,0 +1,195 @@
+import os
+import csv
+import json
+import sqlite3
+import argparse
+import datetime
+import threading
+import pandas as pd
+
+# Which column of each log is its event type (used for the event_type index).
+EVENT_TYPE_COLUMNS = {
+    "deployment_log": "action_type",
+    "healing_log": "strategy",
+    "issue_log": "failure_state",
+    "uptime_log": "status",
+    "master_log": "event_type",
+    "rl_performance_log": "action",
+    "user_feedback_log": "user_feedback",
+    "supervisor_override_log": "event_type",
+}
+IMPORT_BATCH_SIZE = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    name TEXT PRIMARY KEY,
+    header TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    log TEXT NOT NULL,
+    timestamp TEXT,
+    event_type TEXT,
+    status TEXT,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (log, timestamp);
+CREATE INDEX IF NOT EXISTS events_by_type ON events (log, event_type, timestamp);
+CREATE INDEX IF NOT EXISTS events_by_status ON events (log, status, timestamp);
+"""
+
+
+def log_name(path):
+    """Names a log after its CSV file (logs/deployment_log.csv -> deployment_log)."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class EventStore:
+    """
+    SQLite store for the agent logs.
+    Every CSV row becomes one event keyed by its log, with the timestamp, the log's event
+    type column (see EVENT_TYPE_COLUMNS) and the status pulled out into indexed columns,
+    and the full row kept as JSON so each log can be exported back to its CSV layout.
+    Range and type queries use the indexes instead of parsing whole files.
+    Timestamps are ISO 8601 strings, which sort and compare in time order.
+    """
+    def __init__(self, db_path="logs/events.db"):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.headers = {name: json.loads(header) for name, header in self.conn.execute("SELECT name, header FROM logs")}
+
+    def register(self, log, header):
+        """Records the CSV header of a log (the first registration wins)."""
+        if log in self.headers:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO logs (name, header) VALUES (?, ?)", (log, json.dumps(list(header))))
+        self.headers[log] = list(header)
+
+    def _event(self, log, header, row):
+        record = dict(zip(header, row))
+        return (log, record.get("timestamp"), record.get(EVENT_TYPE_COLUMNS.get(log, "")), record.get("status"),
+                json.dumps(list(row)))
+
+    def append(self, log, rows):
+        """Adds rows of a registered log in one transaction."""
+        header = self.headers.get(log)
+        if header is None:
+            raise ValueError(f"Log '{log}' has no registered header.")
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT INTO events (log, timestamp, event_type, status, row) VALUES (?, ?, ?, ?, ?)",
+                                  [self._event(log, header, [str(value) for value in row]) for row in rows])
+
+    def import_csv(self, path, log=None):
+        """
+        Imports a CSV log in batches (the header is registered from the file).
+        Returns:
+            int: Number of rows imported.
+        """
+        log = log or log_name(path)
+        imported = 0
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return 0
+            self.register(log, header)
+            batch = []
+            for row in reader:
+                batch.append(row)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self.append(log, batch)
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                self.append(log, batch)
+                imported += len(batch)
+        return imported
+
+    def _where(self, log, event_type=None, status=None, since=None, until=None):
+        clauses, params = ["log = ?"], [log]
+        for clause, value in (("event_type = ?", event_type), ("status = ?", status),
+                              ("timestamp >= ?", since), ("timestamp < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value.isoformat() if isinstance(value, datetime.datetime) else value)
+        return " AND ".join(clauses), params
+
+    def query(self, log, event_type=None, status=None, since=None, until=None, limit=None):
+        """
+        Returns the matching rows of a log as a DataFrame in its CSV layout, oldest first.
+        Args:
+            log (str): Log name, e.g. 'deployment_log'.
+            event_type (str): Value of the log's event type column (e.g. 'deploy').
+            status (str): Value of the status column (e.g. 'failure').
+            since, until (datetime or str): Timestamp range [since, until).
+            limit (int): Return only the newest `limit` matching rows.
+        """
+        where, params = self._where(log, event_type, status, since, until)
+        sql = f"SELECT row FROM events WHERE {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = [json.loads(row) for (row,) in self.conn.execute(sql, params)]
+        return pd.DataFrame(rows[::-1], columns=self.headers.get(log))
+
+    def count(self, log, event_type=None, status=None, since=None, until=None):
+        """Counts the matching events of a log without loading them."""
+        where, params = self._where(log, event_type, status, since, until)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM events WHERE {where}", params).fetchone()[0]
+
+    def export_csv(self, log, path):
+        """
+        Writes a log back out in its original CSV layout, in insertion order.
+        Returns:
+            int: Number of rows written.
+        """
+        written = 0
+        with self._lock, open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.headers[log])
+            for (row,) in self.conn.execute("SELECT row FROM events WHERE log = ? ORDER BY id", (log,)):
+                writer.writerow(json.loads(row))
+                written += 1
+        return written
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite event store for the agent logs")
+    parser.add_argument("--db", type=str, default=os.path.join("logs", "events.db"))
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import CSV logs")
+    import_parser.add_argument("files", nargs="+")
+    export_parser = commands.add_parser("export", help="Export a log to CSV")
+    export_parser.add_argument("log")
+    export_parser.add_argument("output")
+    query_parser = commands.add_parser("query", help="Count and show matching events")
+    query_parser.add_argument("log")
+    query_parser.add_argument("--type", dest="event_type")
+    query_parser.add_argument("--status")
+    query_parser.add_argument("--since-hours", type=float, help="Only events from the last N hours")
+    query_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    store = EventStore(args.db)
+    if args.command == "import":
+        for path in args.files:
+            print(f"Imported {store.import_csv(path)} row(s) from {path} into '{log_name(path)}'.")
+    elif args.command == "export":
+        print(f"Exported {store.export_csv(args.log, args.output)} row(s) of '{args.log}' to {args.output}.")
+    else:
+        since = datetime.datetime.now() - datetime.timedelta(hours=args.since_hours) if args.since_hours else None
+        filters = dict(event_type=args.event_type, status=args.status, since=since)
+        print(store.query(args.log, limit=args.limit, **filters).to_string(index=False))
+        print(f"\n{store.count(args.log, **filters)} matching event(s).")
+    store.close()
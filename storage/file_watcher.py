@@ -0,0 +1,151 @@
+import os
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+
+# inotify flags (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class FileWatcher:
+    """
+    Reports which watched files changed.
+    Watches whole directories (any *.csv file in them) and single files. On Linux the
+    kernel's inotify interface is used through ctypes, so a change is seen as soon as
+    it is written; elsewhere, or if inotify is unavailable, directories are polled by
+    comparing file sizes and modification times. Hidden and temporary files (e.g. the
+    '.tmp' files written before an atomic rename) are ignored.
+    """
+    def __init__(self, directories=(), files=(), poll_interval=0.5, debounce=0.05, use_inotify=True):
+        """
+        Initializes the watcher.
+        Args:
+            directories (iterable): Directories whose CSV files are watched.
+            files (iterable): Individual files to watch.
+            poll_interval (float): Seconds between scans in polling mode.
+            debounce (float): After a first change, how long to keep collecting changes
+                so a burst of writes is reported as one batch.
+            use_inotify (bool): Set to False to force polling.
+        """
+        self.directories = {os.path.normpath(d) for d in directories}
+        self.files = {os.path.normpath(f) for f in files}
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.fd = None
+        self.watches = {}
+        if use_inotify:
+            self._init_inotify()
+        self.mode = "inotify" if self.fd is not None else "polling"
+        self.snapshot = self._scan() if self.fd is None else {}
+
+    def _init_inotify(self):
+        """Sets up inotify watches on the watched directories and the parents of watched files."""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        for directory in self.directories | {os.path.dirname(f) or "." for f in self.files}:
+            wd = libc.inotify_add_watch(fd, directory.encode(), IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+            if wd < 0:
+                os.close(fd)
+                return
+            self.watches[wd] = directory
+        self.fd = fd
+
+    def _is_watched(self, path):
+        name = os.path.basename(path)
+        if name.startswith(".") or name.endswith(".tmp"):
+            return False
+        return path in self.files or (os.path.dirname(path) in self.directories and name.endswith(".csv"))
+
+    def _scan(self):
+        """Returns {path: (size, mtime_ns)} for every watched file that exists."""
+        found = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        path = os.path.normpath(entry.path)
+                        if entry.is_file() and self._is_watched(path):
+                            stat = entry.stat()
+                            found[path] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        for path in self.files:
+            try:
+                stat = os.stat(path)
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return found
+
+    def _read_inotify(self, timeout):
+        """Returns the watched paths named in the inotify events that arrive within the timeout."""
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            path = os.path.normpath(os.path.join(self.watches.get(wd, ""), name))
+            if self._is_watched(path):
+                changed.add(path)
+        return changed
+
+    def _poll(self, timeout):
+        """Rescans until something changed or the timeout expires."""
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            current = self._scan()
+            changed = {path for path, info in current.items() if self.snapshot.get(path) != info}
+            self.snapshot = current
+            if changed or (deadline is not None and time.time() >= deadline):
+                return changed
+            wait = self.poll_interval if deadline is None else min(self.poll_interval, max(0.0, deadline - time.time()))
+            time.sleep(wait)
+
+    def wait(self, timeout=None):
+        """
+        Blocks until at least one watched file changes (or the timeout expires).
+        Returns:
+            set: Normalized paths of the files that changed (empty on timeout).
+        """
+        if self.fd is None:
+            changed = self._poll(timeout)
+            if changed and self.debounce:
+                time.sleep(self.debounce)
+                changed |= self._poll(0)
+            return changed
+        # Events for unwatched files in a watched directory come back empty, so keep
+        # reading until a watched file changes or the timeout expires.
+        deadline = time.time() + timeout if timeout is not None else None
+        changed = set()
+        while not changed and (deadline is None or time.time() < deadline):
+            changed = self._read_inotify(None if deadline is None else max(0.0, deadline - time.time()))
+        while changed:
+            more = self._read_inotify(self.debounce)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
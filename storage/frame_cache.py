@@ -0,0 +1,99 @@
+import io
+import os
+import threading
+import pandas as pd
+from storage.csv_access import fingerprint, is_valid_offset
+
+
+class _CachedFile:
+    def __init__(self, stat, offset, frame):
+        self.signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.offset = offset
+        self.fingerprint = None
+        self.frame = frame
+
+
+class FrameCache:
+    """
+    Keeps CSV files loaded as DataFrames and reloads them only as far as they changed.
+    A file whose inode, size and modification time are unchanged is not read at all.
+    For an append-only log, only the bytes after the last parsed offset are read and
+    the new rows are concatenated onto the cached frame; if the file was rewritten or
+    truncated (checked with a fingerprint of the bytes before the offset, as in
+    storage/csv_access.py) it is parsed again from the start. Timestamp columns are
+    converted once, when their rows are first parsed.
+    The cache is thread-safe, so one instance can serve every dashboard session.
+    """
+    def __init__(self, date_columns=("timestamp",)):
+        """
+        Initializes an empty cache.
+        Args:
+            date_columns (iterable): Columns converted with pd.to_datetime (invalid values become NaT).
+        """
+        self.date_columns = list(date_columns)
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _parse(self, data, names=None, index_col=None):
+        frame = pd.read_csv(io.BytesIO(data), header=None if names else "infer", names=names, index_col=index_col)
+        for column in self.date_columns:
+            if column in frame.columns:
+                frame[column] = pd.to_datetime(frame[column], errors='coerce')
+        return frame
+
+    def _read_complete(self, path, offset):
+        """Returns the bytes from `offset` up to the last complete line, and the offset after them."""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        return data[:end], offset + end
+
+    def _load_full(self, path, stat, index_col):
+        data, offset = self._read_complete(path, 0)
+        frame = self._parse(data, index_col=index_col) if data else pd.DataFrame()
+        return _CachedFile(stat, offset, frame)
+
+    def load(self, path, append_only=True, index_col=None):
+        """
+        Returns the current contents of a CSV file.
+        Args:
+            path (str): Path to the CSV file.
+            append_only (bool): True for logs that only grow at the end; False for files
+                that are rewritten in place (e.g. datasets), which are re-parsed on change.
+            index_col: Passed to pd.read_csv (tails of indexed files are re-parsed in full).
+        Returns:
+            pd.DataFrame: A copy of the cached frame (empty if the file is missing);
+                callers may modify it freely.
+        Raises:
+            pd.errors.ParserError: If the file cannot be parsed.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            try:
+                stat = os.stat(key)
+            except FileNotFoundError:
+                self._files.pop(key, None)
+                return pd.DataFrame()
+            cached = self._files.get(key)
+            if cached is not None and cached.signature == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                return cached.frame.copy()
+
+            can_extend = (append_only and index_col is None and cached is not None and cached.offset > 0
+                          and not cached.frame.empty and cached.signature[0] == stat.st_ino
+                          and is_valid_offset(key, cached.offset, cached.fingerprint))
+            if can_extend:
+                data, offset = self._read_complete(key, cached.offset)
+                if data:
+                    tail = self._parse(data, names=list(cached.frame.columns))
+                    cached.frame = pd.concat([cached.frame, tail], ignore_index=True)
+                cached.signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                cached.offset = offset
+            else:
+                try:
+                    cached = self._load_full(key, stat, index_col)
+                except pd.errors.EmptyDataError:
+                    cached = _CachedFile(stat, 0, pd.DataFrame())
+            cached.fingerprint = fingerprint(key, cached.offset)
+            self._files[key] = cached
+            return cached.frame.copy()
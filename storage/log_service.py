@@ -0,0 +1,215 @@
+import os
+import json
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+from storage.log_sink import create_log_sink
+
+DEFAULT_SOCKET = os.path.join("logs", "log_service.sock")
+DEFAULT_LOG_DIR = "logs"
+ACK_ROWS = 100  # The client asks for an acknowledgement (a full flush) after this many unacknowledged rows
+
+
+class _LogRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles one client connection. Messages are JSON lines:
+    {"op": "write", "path": ..., "rows": [...]} is applied without a reply (a rejected
+    write is only logged here, since the client does not read a reply for it);
+    "register" (with "header") and "flush" are always answered with {"ok": ...} once done.
+    """
+    def handle(self):
+        sink = self.server.sink
+        for line in self.rfile:
+            op = None
+            try:
+                message = json.loads(line)
+                op = message.get("op")
+                path = message.get("path")
+                if path is not None:
+                    path = self.server.check_path(path)
+                if op == "write":
+                    sink.write_rows(path, message["rows"])
+                    continue
+                if op == "register":
+                    sink.register(path, message["header"])
+                elif op == "flush":
+                    sink.flush(path)
+                else:
+                    raise ValueError(f"Unknown operation '{op}'.")
+                reply = {"ok": True}
+            except (ValueError, KeyError, TypeError, AttributeError, OSError) as e:
+                print(f"Log Service: Rejected {op or 'malformed'} message: {e}")
+                if op not in ("register", "flush"):
+                    continue  # Nobody waits for a reply to this message.
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+
+class LogService(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Single-writer log service for concurrent pipeline processes.
+    Every process sends its rows over a Unix socket and this process alone appends
+    them to the log files through one LogSink, so rows from different processes never
+    interleave inside a line. Rows from one connection keep their order; rows from
+    different connections are written in the order they arrive. Only files inside the
+    log directory are written.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, sink=None, log_dir=DEFAULT_LOG_DIR):
+        """
+        Initializes the service.
+        Args:
+            socket_path (str): Path of the Unix socket to listen on.
+            sink (LogSink): Sink that batches the writes (defaults to the LOG_SINK settings).
+            log_dir (str): Directory the clients' log files must be in.
+        """
+        self.socket_path = socket_path
+        self.log_dir = os.path.realpath(log_dir)
+        self.sink = sink or create_log_sink()
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left over from a service that did not shut down cleanly.
+        super().__init__(socket_path, _LogRequestHandler)
+        print(f"Initialized Log Service on {socket_path}.")
+
+    def check_path(self, path):
+        """Returns the resolved path if it lies inside the log directory, otherwise raises ValueError."""
+        resolved = os.path.realpath(path)
+        if os.path.commonpath([resolved, self.log_dir]) != self.log_dir:
+            raise ValueError(f"'{path}' is outside the log directory {self.log_dir}.")
+        return resolved
+
+    def server_close(self):
+        super().server_close()
+        self.sink.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class LogServiceClient:
+    """
+    Sends log rows to a LogService; has the same interface as LogSink, so agents use
+    either one through get_log_sink(). Writes are sent without waiting for a reply;
+    register() and flush() wait until the service has done them, so a flush followed
+    by a read sees every row this process logged. If the service cannot be reached,
+    the client falls back to writing the files itself through a local LogSink.
+    Sent rows are kept until a full flush confirms they are on disk, which the client
+    requests every ACK_ROWS rows. If the connection breaks before that, the kept rows are
+    sent again (to the reconnected service or the local fallback), so a service crash
+    loses no rows; a row may be written twice if only the connection broke.
+    """
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        self._fallback = None
+        self._socket = None
+        self._reader = None
+        self._unacked = []  # (path, rows) sent since the last full flush
+        try:
+            self._connect()
+        except OSError as e:
+            self._use_fallback(e)
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._socket, self._reader = sock, sock.makefile("rb")
+
+    def _use_fallback(self, error):
+        print(f"Warning: Log service at {self.socket_path} unavailable ({error}). Writing log files directly.")
+        self._fallback = create_log_sink()
+        for path, rows in self._unacked:
+            self._fallback.write_rows(path, rows)
+        self._unacked = []
+
+    def _encode(self, message):
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+    def _send(self, message, wait_for_reply=False):
+        """Sends a message (reconnecting once if the connection broke); returns False if the service is gone."""
+        data = self._encode(message)
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                        # Rows not confirmed on the old connection may have died with the service.
+                        for path, rows in self._unacked:
+                            self._socket.sendall(self._encode({"op": "write", "path": path, "rows": rows}))
+                    self._socket.sendall(data)
+                    if wait_for_reply:
+                        reply = json.loads(self._reader.readline() or b'{"ok": false, "error": "connection closed"}')
+                        if not reply.get("ok"):
+                            raise OSError(reply.get("error"))
+                    return True
+                except OSError as e:
+                    self._close_socket()
+                    if attempt == 1:
+                        self._use_fallback(e)
+        return False
+
+    def register(self, path, header):
+        if self._fallback or not self._send({"op": "register", "path": os.path.abspath(path), "header": list(header)}, True):
+            self._fallback.register(path, header)
+
+    def write(self, path, row):
+        self.write_rows(path, [row])
+
+    def write_rows(self, path, rows):
+        path, rows = os.path.abspath(path), [list(row) for row in rows]
+        if self._fallback or not self._send({"op": "write", "path": path, "rows": rows}):
+            self._fallback.write_rows(path, rows)
+            return
+        with self._lock:
+            self._unacked.append((path, rows))
+            waiting = sum(len(unacked_rows) for _, unacked_rows in self._unacked)
+        if waiting >= ACK_ROWS:
+            self.flush()
+
+    def flush(self, path=None):
+        path = os.path.abspath(path) if path else None
+        if self._fallback or not self._send({"op": "flush", "path": path}, True):
+            self._fallback.flush(path)
+            return
+        with self._lock:
+            self._unacked = [entry for entry in self._unacked if path is not None and entry[0] != path]
+
+    def _close_socket(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = self._reader = None
+
+    def close(self):
+        with self._lock:
+            self._close_socket()
+        if self._fallback:
+            self._fallback.close()
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-writer log service for concurrent pipeline processes")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument("--log-dir", type=str, default=DEFAULT_LOG_DIR, help="Only log files inside this directory are written")
+    args = parser.parse_args()
+
+    service = LogService(args.socket, log_dir=args.log_dir)
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    print(f"Set LOG_SERVICE_SOCKET={args.socket} for the pipeline processes. Stop with Ctrl+C.")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\nLog Service: Shutting down.")
+    finally:
+        service.server_close()
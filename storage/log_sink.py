@@ -0,0 +1,164 @@
+import os
+import csv
+import atexit
+import sqlite3
+import threading
+from storage.event_store import EventStore, log_name
+from config import LOG_SINK
+
+FSYNC_POLICIES = ["never", "flush", "always"]
+
+
+class LogSink:
+    """
+    Buffered CSV appender shared by all agents.
+    Keeps one open handle per log file and collects rows in memory; they are written
+    when `flush_rows` rows are waiting, every `flush_interval` seconds (from a background
+    thread), before a reader in this process calls flush(), and at interpreter exit.
+    A log file that was deleted or replaced is reopened (with its header) on the next flush.
+    With an event store attached, every flushed row is also added to it.
+    """
+    def __init__(self, flush_interval=1.0, flush_rows=100, fsync="never", event_store=None):
+        """
+        Initializes the sink.
+        Args:
+            flush_interval (float): Longest time a row stays buffered, in seconds.
+            flush_rows (int): Number of buffered rows that triggers a flush.
+            fsync (str): 'never' leaves durability to the OS, 'flush' fsyncs each flushed
+                file, 'always' writes and fsyncs every row immediately.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'.")
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.fsync = fsync
+        self.event_store = event_store
+        self._lock = threading.RLock()
+        self._handles = {}
+        self._buffers = {}
+        self._headers = {}
+        self._pending = 0
+        self._thread = None
+        self._stop = threading.Event()
+        atexit.register(self.close)
+
+    def register(self, path, header):
+        """Creates a log file with its header if it is missing or empty, and remembers the header for reopening."""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._headers[key] = list(header)
+            if self.event_store:
+                try:
+                    self.event_store.register(log_name(key), header)
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not register '{key}' with the event store: {e}")
+            if not os.path.exists(key) or os.path.getsize(key) == 0:
+                os.makedirs(os.path.dirname(key), exist_ok=True)
+                with open(key, "w", newline="") as f:
+                    csv.writer(f).writerow(header)
+
+    def write(self, path, row):
+        """Queues one row for a log file."""
+        self.write_rows(path, [row])
+
+    def write_rows(self, path, rows):
+        """Queues several rows for a log file, keeping their order."""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._buffers.setdefault(key, []).extend(rows)
+            self._pending += len(rows)
+            if self.fsync == "always" or self._pending >= self.flush_rows:
+                self._flush_locked()
+            self._start_flusher()
+
+    def flush(self, path=None):
+        """Writes the buffered rows of one log file (or of all of them) to disk."""
+        with self._lock:
+            self._flush_locked(None if path is None else os.path.abspath(path))
+
+    def _handle(self, key):
+        """Returns an open append handle, reopening it if the file was deleted or replaced."""
+        handle = self._handles.get(key)
+        try:
+            if handle is not None and os.stat(key).st_ino == os.fstat(handle.fileno()).st_ino:
+                return handle
+        except FileNotFoundError:
+            pass
+        if handle is not None:
+            handle.close()
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        handle = open(key, "a", newline="")
+        if handle.tell() == 0 and key in self._headers:
+            csv.writer(handle).writerow(self._headers[key])
+        self._handles[key] = handle
+        return handle
+
+    def _flush_locked(self, key=None):
+        keys = [key] if key is not None else list(self._buffers)
+        for key in keys:
+            rows = self._buffers.pop(key, None)
+            if not rows:
+                continue
+            handle = self._handle(key)
+            csv.writer(handle).writerows(rows)
+            handle.flush()
+            if self.fsync != "never":
+                os.fsync(handle.fileno())
+            self._pending -= len(rows)
+            if self.event_store and key in self._headers:
+                self._mirror(key, rows)
+
+    def _mirror(self, key, rows):
+        """Adds flushed rows to the event store; a store error never fails the CSV logging."""
+        try:
+            self.event_store.append(log_name(key), rows)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Warning: Could not mirror {len(rows)} row(s) of '{key}' to the event store: {e}")
+
+    def _start_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._flush_loop, name="log-sink-flusher", daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Flushes everything and closes the handles; later writes reopen them."""
+        self._stop.set()
+        with self._lock:
+            self._flush_locked()
+            for handle in self._handles.values():
+                handle.close()
+            self._handles = {}
+
+
+def create_log_sink():
+    """Returns a LogSink with the LOG_SINK settings from config.py."""
+    store_path = LOG_SINK.get("event_store")
+    return LogSink(flush_interval=LOG_SINK["flush_interval_s"], flush_rows=LOG_SINK["flush_rows"],
+                   fsync=LOG_SINK["fsync"], event_store=EventStore(store_path) if store_path else None)
+
+
+_shared_sink = None
+_shared_lock = threading.Lock()
+
+
+def get_log_sink():
+    """
+    Returns the process-wide sink configured by LOG_SINK in config.py: a client of the
+    log service if a service socket is configured (or set in LOG_SERVICE_SOCKET),
+    otherwise a LogSink writing the files directly.
+    """
+    global _shared_sink
+    with _shared_lock:
+        if _shared_sink is None:
+            socket_path = os.environ.get("LOG_SERVICE_SOCKET") or LOG_SINK.get("service_socket")
+            if socket_path:
+                from storage.log_service import LogServiceClient
+                _shared_sink = LogServiceClient(socket_path)
+            else:
+                _shared_sink = create_log_sink()
+    return _shared_sink
@@ -0,0 +1,63 @@
+import os
+import json
+import datetime
+from storage.csv_access import fingerprint
+
+
+def journal_path(dataset_path):
+    """Returns the undo journal path that sits next to a dataset (like its .bak file)."""
+    return f"{dataset_path}.journal"
+
+
+def record_rollback_point(dataset_path, offset, rows_added):
+    """
+    Records the pre-append size of a dataset as its rollback point.
+    Each append adds one small JSON line, so the journal grows with the number
+    of ingestions rather than with the size of the data.
+    Args:
+        dataset_path (str): Path to the dataset that was appended to.
+        offset (int): File size before the append.
+        rows_added (int): Number of rows written by the append.
+    """
+    entry = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "offset": offset,
+        "fingerprint": fingerprint(dataset_path, offset),
+        "size_after": os.path.getsize(dataset_path),
+        "rows_added": rows_added
+    }
+    with open(journal_path(dataset_path), 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_rollback_points(dataset_path):
+    """Returns all journaled rollback points for a dataset, oldest first."""
+    try:
+        with open(journal_path(dataset_path), 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def rollback_to_last_point(dataset_path):
+    """
+    Undoes the most recent journaled append by truncating the dataset back to its
+    pre-append offset. The cost depends only on the journal size, not the dataset.
+    Returns:
+        dict or None: The rollback point that was applied, or None if there is no
+        usable point (e.g. the file was rewritten since, so its prefix no longer matches).
+    """
+    points = load_rollback_points(dataset_path)
+    if not points or not os.path.exists(dataset_path):
+        return None
+    point = points[-1]
+    if os.path.getsize(dataset_path) < point["offset"] or fingerprint(dataset_path, point["offset"]) != point["fingerprint"]:
+        return None
+
+    os.truncate(dataset_path, point["offset"])
+    remaining = journal_path(dataset_path) + ".tmp"
+    with open(remaining, 'w') as f:
+        for entry in points[:-1]:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(remaining, journal_path(dataset_path))
+    return point
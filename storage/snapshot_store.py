@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import datetime
+
+
+class SnapshotStore:
+    """
+    Content-addressed, chunked snapshot store for dataset CSVs.
+    Files are split into line-aligned, content-defined chunks, and each chunk is
+    stored once (compressed) under its SHA-256. Chunks are small, so appending rows
+    only stores the changed tail chunk. The list of chunk hashes is chunked the same
+    way (one hash per line) and stored as objects too, except for its last piece,
+    which is kept in the manifest; generations that share rows therefore share both
+    the data and most of the list, and a manifest stays small for large files.
+    """
+    def __init__(self, root="dataset/.snapshots", min_chunk_size=1024, max_chunk_size=8192, boundary_bits=4, keep=None):
+        """
+        Initializes the store.
+        Args:
+            root (str): Directory holding the chunk objects and manifests.
+            min_chunk_size (int): Bytes a chunk must reach before it may be cut.
+            max_chunk_size (int): Hard upper bound on chunk size.
+            boundary_bits (int): A line ends a chunk when this many low bits of its
+                CRC are zero, so boundaries depend on content, not on position.
+            keep (int): If set, create_snapshot prunes each dataset to its newest `keep`
+                snapshots (see prune) once it holds 10% more than that.
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifests_dir = os.path.join(root, "manifests")
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.boundary_mask = (1 << boundary_bits) - 1
+        self.keep = keep
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    def _iter_chunks(self, lines):
+        """Yields the content-defined chunks of an iterable of lines (e.g. a binary file)."""
+        chunk, size = [], 0
+        for line in lines:
+            chunk.append(line)
+            size += len(line)
+            if size >= self.max_chunk_size or (size >= self.min_chunk_size and zlib.crc32(line) & self.boundary_mask == 0):
+                yield b''.join(chunk)
+                chunk, size = [], 0
+        if chunk:
+            yield b''.join(chunk)
+
+    def _read_object(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def _store_chunk_list(self, chunks):
+        """
+        Stores a snapshot's chunk list and returns (index, tail): the hashes of the list
+        chunks, and the chunk hashes of its last list chunk, which are kept in the manifest
+        because that chunk ends with the data's tail chunk and changes with every append.
+        """
+        pieces = list(self._iter_chunks(f"{digest}\n".encode("ascii") for digest in chunks))
+        index = []
+        for data in pieces[:-1]:
+            digest = hashlib.sha256(data).hexdigest()
+            self._write_object(digest, data)
+            index.append(digest)
+        return index, pieces[-1].decode("ascii").split() if pieces else []
+
+    def _chunk_list(self, manifest):
+        """Returns the data chunk hashes of a snapshot (older manifests list them all in 'chunks')."""
+        if "chunks" in manifest:
+            return manifest["chunks"]
+        return b''.join(self._read_object(digest) for digest in manifest["index"]).decode("ascii").split() + manifest["tail"]
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _write_object(self, digest, data):
+        """Stores a chunk unless an identical one is already present."""
+        object_path = self._object_path(digest)
+        if os.path.exists(object_path):
+            return
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = f"{object_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(data))
+        os.replace(tmp_path, object_path)
+
+    def _dataset_dir(self, dataset_path):
+        """
+        Names the manifest directory after the dataset and a hash of its full path, so
+        datasets with the same file name in different directories keep separate histories.
+        """
+        digest = hashlib.sha1(os.path.abspath(dataset_path).encode("utf-8")).hexdigest()[:12]
+        dataset_dir = os.path.join(self.manifests_dir, f"{os.path.basename(dataset_path)}.{digest}")
+        self._migrate_legacy_dir(dataset_path, dataset_dir)
+        return dataset_dir
+
+    def _migrate_legacy_dir(self, dataset_path, dataset_dir):
+        """Moves this dataset's manifests out of a directory named by file name only (older stores)."""
+        legacy_dir = os.path.join(self.manifests_dir, os.path.basename(dataset_path))
+        if os.path.isdir(dataset_dir) or not os.path.isdir(legacy_dir):
+            return
+        for manifest in self._read_manifests(legacy_dir):
+            if os.path.abspath(manifest["dataset"]) == os.path.abspath(dataset_path):
+                os.makedirs(dataset_dir, exist_ok=True)
+                name = f"{manifest['id']}.json"
+                os.replace(os.path.join(legacy_dir, name), os.path.join(dataset_dir, name))
+        if not os.listdir(legacy_dir):
+            os.rmdir(legacy_dir)
+
+    def _read_manifests(self, dataset_dir):
+        """Returns the manifests in a manifest directory, newest first."""
+        if not os.path.isdir(dataset_dir):
+            return []
+        snapshots = []
+        for name in sorted(os.listdir(dataset_dir), reverse=True):
+            if name.endswith(".json"):
+                with open(os.path.join(dataset_dir, name), 'r') as f:
+                    snapshots.append(json.load(f))
+        return snapshots
+
+    def _write_manifest(self, manifest):
+        dataset_dir = self._dataset_dir(manifest["dataset"])
+        os.makedirs(dataset_dir, exist_ok=True)
+        manifest_path = os.path.join(dataset_dir, f"{manifest['id']}.json")
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def create_snapshot(self, dataset_path, label=None):
+        """
+        Snapshots a dataset. Only chunks not already in the store are written.
+        If the content matches the latest snapshot, that snapshot is reused (and
+        gains the label when one is given) instead of adding a duplicate.
+        Returns:
+            dict: The snapshot manifest.
+        """
+        file_hash = hashlib.sha256()
+        chunks = []
+        with open(dataset_path, 'rb') as f:
+            for data in self._iter_chunks(f):
+                digest = hashlib.sha256(data).hexdigest()
+                self._write_object(digest, data)
+                file_hash.update(data)
+                chunks.append(digest)
+
+        snapshots = self.list_snapshots(dataset_path)
+        if snapshots and snapshots[0]["sha256"] == file_hash.hexdigest():
+            latest = snapshots[0]
+            if label and label not in latest["labels"]:
+                latest["labels"].append(label)
+                self._write_manifest(latest)
+            return latest
+
+        index, tail = self._store_chunk_list(chunks)
+        manifest = {
+            "id": f"{int(time.time() * 1000):013d}-{file_hash.hexdigest()[:8]}",
+            "dataset": dataset_path,
+            "created": datetime.datetime.now().isoformat(),
+            "size": os.path.getsize(dataset_path),
+            "sha256": file_hash.hexdigest(),
+            "labels": [label] if label else [],
+            "index": index,
+            "tail": tail
+        }
+        self._write_manifest(manifest)
+        if self.keep and len(snapshots) + 1 > self.keep + max(1, self.keep // 10):
+            self.prune(dataset_path, self.keep)  # In batches, so garbage collection is not paid per snapshot.
+        return manifest
+
+    def list_snapshots(self, dataset_path):
+        """Returns the manifests for a dataset, newest first."""
+        return self._read_manifests(self._dataset_dir(dataset_path))
+
+    def mark(self, dataset_path, snapshot_id, label):
+        """Adds a label (e.g. 'good') to an existing snapshot."""
+        for manifest in self.list_snapshots(dataset_path):
+            if manifest["id"] == snapshot_id:
+                if label not in manifest["labels"]:
+                    manifest["labels"].append(label)
+                    self._write_manifest(manifest)
+                return manifest
+        raise KeyError(f"Snapshot '{snapshot_id}' not found for '{dataset_path}'.")
+
+    def restore_snapshot(self, dataset_path, snapshot_id, target_path=None):
+        """
+        Rebuilds a dataset from one of its snapshots. The file is assembled next to
+        the target, verified against the snapshot hash, then swapped in atomically.
+        Args:
+            dataset_path (str): Dataset whose snapshot history is searched.
+            snapshot_id (str): Snapshot to restore.
+            target_path (str): File to write (defaults to dataset_path), e.g. an
+                isolated copy of the dataset used by a hedged heal.
+        """
+        target_path = target_path or dataset_path
+        manifest = next((m for m in self.list_snapshots(dataset_path) if m["id"] == snapshot_id), None)
+        if manifest is None:
+            raise KeyError(f"Snapshot '{snapshot_id}' not found for '{dataset_path}'.")
+
+        file_hash = hashlib.sha256()
+        tmp_path = f"{target_path}.restore.tmp"
+        with open(tmp_path, 'wb') as out:
+            for digest in self._chunk_list(manifest):
+                data = self._read_object(digest)
+                file_hash.update(data)
+                out.write(data)
+        if file_hash.hexdigest() != manifest["sha256"]:
+            os.remove(tmp_path)
+            raise ValueError(f"Snapshot '{snapshot_id}' is corrupted (hash mismatch).")
+        os.replace(tmp_path, target_path)
+        return manifest
+
+    def prune(self, dataset_path, keep=100):
+        """
+        Drops all but the newest `keep` snapshots of a dataset, then removes unreferenced
+        chunks. The newest snapshot labelled 'good' is always kept, so a heal can still
+        restore it.
+        """
+        snapshots = self.list_snapshots(dataset_path)
+        good = next((manifest for manifest in snapshots if "good" in manifest["labels"]), None)
+        for manifest in snapshots[keep:]:
+            if manifest is not good:
+                os.remove(os.path.join(self._dataset_dir(dataset_path), f"{manifest['id']}.json"))
+        self.collect_garbage()
+
+    def collect_garbage(self):
+        """Deletes chunk objects no longer referenced by any snapshot."""
+        referenced = set()
+        for dataset_dir in os.listdir(self.manifests_dir):
+            for manifest in self._read_manifests(os.path.join(self.manifests_dir, dataset_dir)):
+                referenced.update(manifest.get("index", []))
+                referenced.update(self._chunk_list(manifest))
+        removed = 0
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for digest in os.listdir(prefix_dir):
+                if digest not in referenced:
+                    os.remove(os.path.join(prefix_dir, digest))
+                    removed += 1
+        return removed
@@ -0,0 +1,234 @@
+import os
+import json
+import datetime
+import threading
+import pandas as pd
+from storage.csv_access import read_header, iter_rows_from, fingerprint, is_valid_offset
+from storage.log_sink import get_log_sink
+
+FIELDS = ["observed_s", "downtime_s", "outages", "repair_s"]
+HOURLY_RETENTION_DAYS = 31  # Older hours are only kept in the daily buckets
+
+
+def rollup_path(timeline_file):
+    """Returns the rollup file kept next to an uptime timeline (logs/uptime_log.csv -> logs/uptime_log_rollup.json)."""
+    return os.path.splitext(timeline_file)[0] + "_rollup.json"
+
+
+def _parse_time(value):
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _empty_totals():
+    return {field: 0 if field == "outages" else 0.0 for field in FIELDS}
+
+
+def _availability(totals):
+    """Turns summed totals into uptime (%) and MTTR (s), both None when nothing was observed."""
+    observed, outages = totals["observed_s"], totals["outages"]
+    return {**totals,
+            "uptime_percent": max(0.0, (1 - totals["downtime_s"] / observed) * 100) if observed > 0 else None,
+            "mttr_s": totals["repair_s"] / outages if outages else None}
+
+
+class UptimeRollup:
+    """
+    Uptime and SLA totals of an uptime timeline, kept up to date incrementally.
+    Each interval between two timeline rows counts as observed time, and as downtime
+    when the earlier row is DOWN (the same definition as the dashboard's uptime score).
+    An outage runs from the first DOWN row to the next other row; its length is the
+    repair time behind the MTTR. Totals are kept overall and in hourly and daily
+    buckets (intervals are split at bucket boundaries; an outage counts in the bucket
+    where it ends), so any figure is a sum over a few counters. Hourly buckets are kept
+    for the last HOURLY_RETENTION_DAYS days of the timeline, daily ones for all of it. The log is read from a
+    saved offset like the LatencyModel, so the rollups only depend on the timeline and
+    every writer of it derives the same numbers.
+    """
+    def __init__(self, timeline_file, state_file=None):
+        """
+        Initializes the rollups from the saved state.
+        Args:
+            timeline_file (str): Path to the uptime timeline (e.g. 'logs/uptime_log.csv').
+            state_file (str): Path of the rollup JSON file (defaults to rollup_path(timeline_file)).
+        """
+        self.timeline_file = timeline_file
+        self.state_file = state_file or rollup_path(timeline_file)
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.offset, self.fingerprint = 0, ""
+        self.first_timestamp = self.last_timestamp = self.last_status = self.down_since = None
+        self.totals = _empty_totals()
+        self.hourly, self.daily = {}, {}
+
+    def _load(self):
+        try:
+            with open(self.state_file, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if is_valid_offset(self.timeline_file, saved["offset"], saved["fingerprint"]):
+            self.offset, self.fingerprint = saved["offset"], saved["fingerprint"]
+            self.first_timestamp, self.last_timestamp = saved["first_timestamp"], saved["last_timestamp"]
+            self.last_status, self.down_since = saved["last_status"], saved["down_since"]
+            self.totals, self.hourly, self.daily = saved["totals"], saved["hourly"], saved["daily"]
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp_file = f"{self.state_file}.{os.getpid()}.{threading.get_ident()}.tmp"  # Unique per writer
+        with open(tmp_file, "w") as f:
+            # json.dumps uses the C encoder (json.dump streams through the pure-Python one),
+            # which matters once there are thousands of hourly buckets.
+            f.write(json.dumps({"offset": self.offset, "fingerprint": self.fingerprint,
+                                "first_timestamp": self.first_timestamp, "last_timestamp": self.last_timestamp,
+                                "last_status": self.last_status, "down_since": self.down_since,
+                                "totals": self.totals, "hourly": self.hourly, "daily": self.daily}))
+        os.replace(tmp_file, self.state_file)
+
+    def _add(self, buckets, key, field, amount):
+        bucket = buckets.setdefault(key, list(_empty_totals().values()))
+        bucket[FIELDS.index(field)] += amount
+
+    def _add_interval(self, start, end, down):
+        """Adds an observed interval to the totals and to every hour it overlaps."""
+        self.totals["observed_s"] += (end - start).total_seconds()
+        if down:
+            self.totals["downtime_s"] += (end - start).total_seconds()
+        while start < end:
+            hour_end = min(start.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1), end)
+            seconds = (hour_end - start).total_seconds()
+            for buckets, key in ((self.hourly, start.strftime("%Y-%m-%dT%H")), (self.daily, start.strftime("%Y-%m-%d"))):
+                self._add(buckets, key, "observed_s", seconds)
+                if down:
+                    self._add(buckets, key, "downtime_s", seconds)
+            start = hour_end
+
+    def _apply(self, timestamp, status):
+        now = _parse_time(timestamp)
+        if now is None:
+            return
+        previous = _parse_time(self.last_timestamp)
+        if previous is None:
+            self.first_timestamp = timestamp
+        elif now > previous:
+            self._add_interval(previous, now, self.last_status == "DOWN")
+        else:
+            now, timestamp = previous, self.last_timestamp  # Out-of-order row from another writer.
+
+        if status == "DOWN" and self.down_since is None:
+            self.down_since = timestamp
+        elif status != "DOWN" and self.down_since is not None:
+            repair = max(0.0, (now - _parse_time(self.down_since)).total_seconds())
+            self.totals["outages"] += 1
+            self.totals["repair_s"] += repair
+            for buckets, key in ((self.hourly, now.strftime("%Y-%m-%dT%H")), (self.daily, now.strftime("%Y-%m-%d"))):
+                self._add(buckets, key, "outages", 1)
+                self._add(buckets, key, "repair_s", repair)
+            self.down_since = None
+        self.last_timestamp, self.last_status = timestamp, status
+
+    def _prune_hourly(self):
+        """Drops hourly buckets of whole days that fell out of the retention window."""
+        last = _parse_time(self.last_timestamp)
+        if last is None:
+            return
+        first_kept = (last - datetime.timedelta(days=HOURLY_RETENTION_DAYS)).strftime("%Y-%m-%dT00")
+        for key in [key for key in self.hourly if key < first_kept]:
+            del self.hourly[key]
+
+    def update(self):
+        """
+        Adds the timeline rows written since the last update and saves the rollups.
+        If the timeline was rotated or rewritten, the rollups are rebuilt from the start.
+        Returns:
+            int: Number of rows added.
+        """
+        get_log_sink().flush(self.timeline_file)
+        if not os.path.exists(self.timeline_file):
+            return 0
+        if not is_valid_offset(self.timeline_file, self.offset, self.fingerprint):
+            self._reset()
+        header = read_header(self.timeline_file)
+        if not {"timestamp", "status"} <= set(header):
+            return 0
+
+        added = 0
+        for row, offset in iter_rows_from(self.timeline_file, self.offset):
+            self.offset = offset
+            record = dict(zip(header, row))
+            self._apply(record["timestamp"], record["status"])
+            added += 1
+        if added:
+            self._prune_hourly()
+            self.fingerprint = fingerprint(self.timeline_file, self.offset)
+            self._save()
+        return added
+
+    def is_current(self):
+        """True if the rollups cover the whole timeline file as it is now."""
+        return os.path.exists(self.timeline_file) and self.offset == os.path.getsize(self.timeline_file)
+
+    def summary(self, since=None):
+        """
+        Returns observed time, downtime, outages, repair time, uptime (%) and MTTR (s).
+        Args:
+            since (datetime): Only count buckets from this hour on (None = all time). Before the
+                hourly retention window, whole days are counted from the daily buckets.
+        """
+        if since is None:
+            return _availability(dict(self.totals))
+        first_key = since.strftime("%Y-%m-%dT%H")
+        first_hourly_day = min(self.hourly)[:10] if self.hourly else "9999-12-31"
+        buckets = [bucket for key, bucket in self.hourly.items() if key >= first_key]
+        buckets += [bucket for day, bucket in self.daily.items() if first_key[:10] <= day < first_hourly_day]
+        totals = _empty_totals()
+        for bucket in buckets:
+            for field, value in zip(FIELDS, bucket):
+                totals[field] += value
+        return _availability(totals)
+
+    def daily_frame(self):
+        """Returns the daily buckets as a DataFrame with an uptime_percent column."""
+        frame = pd.DataFrame([[day, *bucket] for day, bucket in sorted(self.daily.items())],
+                             columns=["day", *FIELDS])
+        frame["uptime_percent"] = (1 - frame["downtime_s"] / frame["observed_s"].where(frame["observed_s"] > 0)) * 100
+        return frame
+
+
+def compute_uptime(timeline_df, start=None, end=None):
+    """
+    Vectorized uptime and MTTR of a timeline DataFrame over an arbitrary range, with the
+    same definitions as UptimeRollup; used for ranges the hourly buckets cannot answer.
+    Args:
+        timeline_df (pd.DataFrame): Timeline with datetime 'timestamp' and 'status' columns.
+        start, end (datetime): Range to count (None = open-ended).
+    """
+    df = timeline_df.dropna(subset=["timestamp"]).sort_values("timestamp", kind="stable")
+    totals = _empty_totals()
+    if len(df) < 2:
+        return _availability(totals)
+    begin, finish = df["timestamp"], df["timestamp"].shift(-1)
+    if start is not None:
+        begin = begin.clip(lower=pd.Timestamp(start))
+    if end is not None:
+        finish = finish.clip(upper=pd.Timestamp(end))
+    seconds = (finish - begin).dt.total_seconds().clip(lower=0).fillna(0)
+    totals["observed_s"] = float(seconds.sum())
+    totals["downtime_s"] = float(seconds[df["status"] == "DOWN"].sum())
+
+    # One row per run of equal statuses; a DOWN run ends where the next run starts.
+    run_id = (df["status"] != df["status"].shift()).cumsum()
+    runs = df.groupby(run_id).agg(status=("status", "first"), started=("timestamp", "first"))
+    runs["ended"] = runs["started"].shift(-1)
+    outages = runs[(runs["status"] == "DOWN") & runs["ended"].notna()]
+    if start is not None:
+        outages = outages[outages["ended"] >= pd.Timestamp(start)]
+    if end is not None:
+        outages = outages[outages["ended"] < pd.Timestamp(end)]
+    totals["outages"] = len(outages)
+    totals["repair_s"] = float((outages["ended"] - outages["started"]).dt.total_seconds().sum())
+    return _availability(totals)
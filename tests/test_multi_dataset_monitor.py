@@ -0,0 +1,30 @@
+import os
+import shutil
+from agents.multi_dataset_monitor import MultiDatasetMonitor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_glob_pattern_infers_type_per_file(tmp_path):
+    # One pattern matching datasets of different types must not reuse the first file's type.
+    for name in ("patient_health.csv", "student_scores.csv"):
+        shutil.copy(os.path.join(REPO_ROOT, "dataset", name), tmp_path / name)
+    monitor = MultiDatasetMonitor(str(tmp_path / "issues.csv"), datasets={str(tmp_path / "*.csv"): None},
+                                  state_dir=str(tmp_path / "state"))
+    types = {os.path.basename(path): detector.detector_type for path, detector in monitor.detectors.items()}
+    monitor.shutdown()
+    assert types == {"patient_health.csv": "patient_health", "student_scores.csv": "student_scores"}
+
+
+def test_process_pool_matches_thread_pool(tmp_path):
+    # Detectors are pickled into the process pool, so they must not hold the log sink.
+    for name in ("patient_health.csv", "student_scores.csv"):
+        shutil.copy(os.path.join(REPO_ROOT, "dataset", name), tmp_path / name)
+    results = {}
+    for use_processes in (False, True):
+        monitor = MultiDatasetMonitor(str(tmp_path / "issues.csv"), datasets={str(tmp_path / "*.csv"): None},
+                                      state_dir=str(tmp_path / f"state_{use_processes}"), workers=2,
+                                      use_processes=use_processes)
+        results[use_processes] = sorted(monitor.check_all())
+        monitor.shutdown()
+    assert results[True] == results[False]
@@ -5,58 +5,82 @@ import datetime
 import subprocess
 import os
 import shutil
+import urllib.request
+import urllib.error
+from storage.csv_access import append_rows
+from storage.rollback_journal import record_rollback_point
 
-def simulate_data_change(dataset_path, force_anomaly=False):
-    """Creates a backup and appends new data, with a more impactful anomaly simulation."""
+def _generate_records(dataset_path, force_anomaly=False):
+    """Builds the new rows for a simulated data change, with a more impactful anomaly simulation."""
+    records = []
+    if "student_scores" in dataset_path:
+        # Add multiple low-score rows to guarantee the average drops below the threshold.
+        if force_anomaly:
+            print("  -> Forcing a significant student score anomaly...")
+            for _ in range(5): # Add 5 bad records
+                records.append({
+                    'timestamp': pd.Timestamp.now().strftime('%Y-%m-%d'),
+                    'name': random.choice(['Alice', 'Bob', 'Charlie', 'David']),
+                    'subject': random.choice(['Math', 'Science', 'History', 'English']),
+                    'score': random.randint(10, 20) # Very low scores
+                })
+        else:
+            records.append({
+                'timestamp': pd.Timestamp.now().strftime('%Y-%m-%d'),
+                'name': random.choice(['Alice', 'Bob', 'Charlie', 'David']),
+                'subject': random.choice(['Math', 'Science', 'History', 'English']),
+                'score': random.randint(50, 100)
+            })
+            print("  -> Added a new student score record.")
+
+    elif "patient_health" in dataset_path:
+        # Also make the health anomaly more impactful
+        if force_anomaly:
+            print("  -> Forcing a significant patient health anomaly...")
+            hr, o2 = 150, 90
+        else:
+            hr, o2 = random.randint(60, 100), random.randint(96, 100)
+
+        records.append({
+            'timestamp': pd.Timestamp.now(),
+            'heart_rate': hr,
+            'blood_pressure': f"{random.randint(110,140)}/{random.randint(70,90)}",
+            'oxygen_level': o2
+        })
+        print(f"  -> Added new patient health record. {'(ANOMALY FORCED)' if force_anomaly else ''}")
+    return records
+
+def simulate_data_change(dataset_path, force_anomaly=False, append_only=False, snapshot_store=None):
+    """
+    Creates a backup and appends new data, with a more impactful anomaly simulation.
+    With append_only=True, the new rows are written to the end of the file instead of
+    rewriting it, and the pre-append offset is journaled as the rollback point in place
+    of a full .bak copy, so ingestion cost does not depend on the dataset size.
+    If a snapshot_store is given, the pre-change data is also kept as a snapshot.
+    """
     print(f"\nSimulating change for '{dataset_path}'...")
     try:
         if not os.path.exists(dataset_path):
             raise FileNotFoundError(f"Dataset '{dataset_path}' not found. Please create it first.")
 
+        if snapshot_store:
+            snapshot = snapshot_store.create_snapshot(dataset_path, label="pre_change")
+            print(f"  -> Created snapshot: {snapshot['id']}")
+
+        if append_only:
+            records = _generate_records(dataset_path, force_anomaly)
+            offset = append_rows(dataset_path, records)
+            record_rollback_point(dataset_path, offset, len(records))
+            print(f"  -> Appended {len(records)} record(s) to '{dataset_path}' (rollback point at byte {offset}).")
+            return
+
         shutil.copyfile(dataset_path, f"{dataset_path}.bak")
         print(f"  -> Created backup: {dataset_path}.bak")
 
         df = pd.read_csv(dataset_path)
-
-        if "student_scores" in dataset_path:
-            # Add multiple low-score rows to guarantee the average drops below the threshold.
-            if force_anomaly:
-                print("  -> Forcing a significant student score anomaly...")
-                new_rows = []
-                for _ in range(5): # Add 5 bad records
-                    new_rows.append({
-                        'timestamp': pd.Timestamp.now().strftime('%Y-%m-%d'),
-                        'name': random.choice(['Alice', 'Bob', 'Charlie', 'David']),
-                        'subject': random.choice(['Math', 'Science', 'History', 'English']),
-                        'score': random.randint(10, 20) # Very low scores
-                    })
-                df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
-            else:
-                new_row = {
-                    'timestamp': pd.Timestamp.now().strftime('%Y-%m-%d'),
-                    'name': random.choice(['Alice', 'Bob', 'Charlie', 'David']),
-                    'subject': random.choice(['Math', 'Science', 'History', 'English']),
-                    'score': random.randint(50, 100)
-                }
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                print("  -> Added a new student score record.")
-
-        elif "patient_health" in dataset_path:
-            # Also make the health anomaly more impactful
-            if force_anomaly:
-                print("  -> Forcing a significant patient health anomaly...")
-                hr, o2 = 150, 90
-            else:
-                hr, o2 = random.randint(60, 100), random.randint(96, 100)
-            
-            new_row = {
-                'timestamp': pd.Timestamp.now(),
-                'heart_rate': hr,
-                'blood_pressure': f"{random.randint(110,140)}/{random.randint(70,90)}",
-                'oxygen_level': o2
-            }
-            df = pd.concat([df, pd.DataFrame(new_row)], ignore_index=True)
-            print(f"  -> Added new patient health record. {'(ANOMALY FORCED)' if force_anomaly else ''}")
+        records = _generate_records(dataset_path, force_anomaly)
+        if records:
+            df = pd.concat([df, pd.DataFrame(records)], ignore_index=True)
 
         df.to_csv(dataset_path, index=False)
         print(f"  -> Saved new data to '{dataset_path}'.")
@@ -65,9 +89,64 @@ def simulate_data_change(dataset_path, force_anomaly=False):
         print(f"Error simulating data change: {e}")
 
 
-def trigger_dashboard_deployment(timeout=15, should_fail=False, failure_type=None):
+DASHBOARD_APP = "app_dashboard.py"
+DASHBOARD_PORT = 8501
+HEALTH_ENDPOINT = "/_stcore/health"
+
+def dashboard_command(port=DASHBOARD_PORT):
+    """Returns the command line that serves the Streamlit dashboard on a given port."""
+    return ["streamlit", "run", DASHBOARD_APP, "--server.runOnSave", "false",
+            "--server.headless", "true", "--server.port", str(port)]
+
+def start_dashboard_process(port=DASHBOARD_PORT):
+    """Launches the Streamlit dashboard on a given port and returns the process handle."""
+    return subprocess.Popen(dashboard_command(port), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def _http_status(url, probe_timeout):
+    """Returns the HTTP status of a GET (2xx means ok), or None if nothing answered."""
+    try:
+        with urllib.request.urlopen(url, timeout=probe_timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+def is_dashboard_serving(port, probe_timeout=1.0):
+    """
+    Returns True if the dashboard answers its health endpoint with 2xx. Older Streamlit
+    versions have no health endpoint, so a 404 there counts only if '/' answers with 2xx;
+    any other error status (e.g. a stale or unrelated server) means not ready.
+    """
+    base_url = f"http://127.0.0.1:{port}"
+    status = _http_status(base_url + HEALTH_ENDPOINT, probe_timeout)
+    if status == 404:
+        status = _http_status(base_url + "/", probe_timeout)
+    return status is not None and 200 <= status < 300
+
+def wait_for_ready(process, port, timeout=15, interval=0.25, cancel_event=None):
     """
-    Starts the Streamlit dashboard as a subprocess.
+    Polls the dashboard until it serves requests, the process exits, the timeout expires,
+    or the optional cancel_event (a threading.Event) is set.
+    Returns:
+        str: "success" as soon as the server is ready, "cancelled" if cancelled, otherwise "failure".
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cancel_event is not None and cancel_event.is_set():
+            return "cancelled"
+        if process.poll() is not None:
+            return "failure" # The app exited early (likely due to the bad data anomaly)
+        if is_dashboard_serving(port):
+            return "success"
+        time.sleep(interval)
+    return "failure"
+
+def trigger_dashboard_deployment(timeout=15, should_fail=False, failure_type=None, port=DASHBOARD_PORT, cancel_event=None):
+    """
+    Starts the Streamlit dashboard as a subprocess and waits until it is ready.
+    The reported response time is the real time until the server answered its
+    readiness probe (or until it exited / timed out / was cancelled via cancel_event).
     If should_fail is True, it simulates a specific failure type ('crash' or 'latency').
     """
     print("Triggering dashboard deployment...")
@@ -89,17 +168,13 @@ def trigger_dashboard_deployment(timeout=15, should_fail=False, failure_type=Non
     status, process = "failure", None
     start_time = time.time()
     try:
-        command = ["streamlit", "run", "app_dashboard.py", "--server.runOnSave", "false"]
-        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        time.sleep(timeout)
-        if process.poll() is None:
-            status = "success"
-        else:
-            status = "failure" # The app crashed (likely due to the bad data anomaly)
+        process = start_dashboard_process(port)
+        status = wait_for_ready(process, port, timeout=timeout, cancel_event=cancel_event)
+    except OSError as e:
+        print(f"  -> Could not start the dashboard: {e}")
     finally:
         if process and process.poll() is None:
             process.terminate()
             process.wait(timeout=5)
     end_time = time.time()
     return status, (end_time - start_time) * 1000
-